@@ -1,46 +1,132 @@
 import os
+import sys
+import mmap
+from collections import defaultdict
+from itertools import repeat
 
 
-def bmh_search(text, pattern):
-
-    occurrences = []
-    n = len(text)
-    m = len(pattern)
-    
-    # Если подстрока пустая или длиннее текста
-    if m == 0 or m > n:
-        return occurrences
+class BMHPattern:
+    """Скомпилированный образец для BMH: таблица сдвигов строится один раз.
     
-    # Построение таблицы смещений
-    offset_table = {}
-    for i in range(m - 1):
-        offset_table[pattern[i]] = m - i - 1
-    default_offset = m
+    Образец и текст - оба str или оба байтовые (bytes, bytearray, mmap).
+    """
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.is_bytes = not isinstance(pattern, str)
+        m = len(pattern)
+        if self.is_bytes:
+            self.shift = bmh_shift_table(pattern)
+        else:
+            # Символы не из образца сдвигают на m; defaultdict запоминает
+            # их при первой встрече, дальше поиск идет без вызовов Python
+            self.shift = defaultdict(repeat(m).__next__)
+            for i in range(m - 1):
+                self.shift[pattern[i]] = m - i - 1
     
-    # Поиск подстроки
-    i = 0
-    while i <= n - m:
-        j = m - 1  # начинаем сравнение с конца подстроки
+    def finditer(self, text, start=0, end=None):
+        """Генератор позиций всех вхождений (с перекрытиями)"""
+        if self.is_bytes == isinstance(text, str):
+            raise TypeError("Образец и текст должны быть оба str или оба байтовые")
+        pattern = self.pattern
+        shift = self.shift
+        m = len(pattern)
+        n = len(text) if end is None else min(end, len(text))
+        if m == 0:
+            return
         
-        # Сравниваем символы с конца к началу
-        while j >= 0 and pattern[j] == text[i + j]:
-            j -= 1
-        
-        # Если вся подстрока совпала
-        if j < 0:
-            occurrences.append(i)
-            i += 1  # смещаемся на 1 для поиска следующего вхождения
-        else:
-            # Получаем смещение из таблицы для символа в тексте
+        last = pattern[m - 1]
+        head = pattern[:m - 1]
+        i = start
+        while i <= n - m:
             current_char = text[i + m - 1]
-            shift = offset_table.get(current_char, default_offset)
-            i += shift
+            # Сначала последний символ, затем остальные одним сравнением среза
+            if current_char == last and text[i:i + m - 1] == head:
+                yield i
+                i += 1  # смещаемся на 1 для поиска следующего вхождения
+            else:
+                i += shift[current_char]
     
-    return occurrences
+    def search(self, text, start=0, end=None):
+        """Позиция первого вхождения или -1"""
+        return next(self.finditer(text, start, end), -1)
+    
+    def count(self, text, start=0, end=None):
+        """Число вхождений без построения списка"""
+        return sum(1 for _ in self.finditer(text, start, end))
+
+
+def bmh_search(text, pattern):
+
+    # Все вхождения списком; для многих строк с одним образцом выгоднее
+    # один раз создать BMHPattern
+    return list(BMHPattern(pattern).finditer(text))
+
+
+def bmh_shift_table(pattern):
+
+    # Таблица сдвигов по плохому символу для байтов: список на 256 элементов
+    m = len(pattern)
+    shift = [m] * 256
+    for i in range(m - 1):
+        shift[pattern[i]] = m - i - 1
+    return shift
+
+
+def bmh_search_buffer(buffer, pattern, start=0, end=None):
+
+    # Поиск по всему буферу байтов (bytes, mmap); таблица строится один раз.
+    # Возвращает генератор позиций вхождений
+    return BMHPattern(pattern).finditer(buffer, start, end)
+
+
+def count_newlines(buffer, start, end, chunk_size=1 << 20):
+
+    # Число переводов строк в buffer[start:end]; у mmap нет count,
+    # поэтому считаем по срезам ограниченного размера
+    count = 0
+    while start < end:
+        stop = min(start + chunk_size, end)
+        count += buffer[start:stop].count(b'\n')
+        start = stop
+    return count
+
+
+def matching_lines(buffer, offsets):
+
+    # Строки с вхождениями: (номер строки, начало, конец без перевода строки).
+    # Позиции идут по возрастанию, поэтому номер строки считается
+    # нарастающим итогом переводов строк между соседними вхождениями
+    line_num = 1
+    counted = 0
+    line_end = -1
+    for pos in offsets:
+        if pos < line_end:
+            continue  # еще одно вхождение в уже выданной строке
+        line_num += count_newlines(buffer, counted, pos)
+        counted = pos
+        line_start = buffer.rfind(b'\n', 0, pos) + 1
+        line_end = buffer.find(b'\n', pos)
+        if line_end < 0:
+            line_end = len(buffer)
+        yield line_num, line_start, line_end
+
+
+def search_file_mmap(log_file, pattern):
+
+    # Поиск по отображенному в память файлу без чтения его целиком;
+    # возвращает генератор (номер строки, текст строки)
+    with open(log_file, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            offsets = bmh_search_buffer(buffer, pattern.encode('utf-8'))
+            for line_num, line_start, line_end in matching_lines(buffer, offsets):
+                yield line_num, buffer[line_start:line_end].decode('utf-8', errors='ignore')
 
 
 def main():
-    log_file = '/var/log/Xorg.0.log'
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    log_file = args[0] if args else '/var/log/Xorg.0.log'
     level = input("Введите уровень журналирования (II/WW/EE/--/!!): ").strip()
     pattern = f"({level})"
     
@@ -48,6 +134,19 @@ def main():
         print(f"Файл {log_file} не найден")
         return
     
+    # --mmap: поиск по всему файлу сразу, без загрузки строк в память
+    if '--mmap' in sys.argv:
+        found_count = 0
+        try:
+            for line_num, line in search_file_mmap(log_file, pattern):
+                print(f"Строка {line_num}: {line.strip()}")
+                found_count += 1
+        except PermissionError:
+            print("Недостаточно прав для чтения файла")
+            return
+        print(f"\nНайдено сообщений: {found_count}")
+        return
+    
     try:
         with open(log_file, 'r', encoding='utf-8', errors='ignore') as file:
             lines = file.readlines()
@@ -55,9 +154,11 @@ def main():
         print("Недостаточно прав для чтения файла")
         return
     
+    # Для фильтрации строк достаточно первого вхождения
+    compiled = BMHPattern(pattern)
     found_count = 0
     for line_num, line in enumerate(lines, 1):
-        if bmh_search(line, pattern):
+        if compiled.search(line) >= 0:
             print(f"Строка {line_num}: {line.strip()}")
             found_count += 1
     
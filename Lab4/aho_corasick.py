@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+from collections import deque
+
+from BMH import bmh_search
+
+
+LEVELS = ['II', 'WW', 'EE', '--', '!!']
+
+
+def build_automaton(patterns):
+    # Бор по образцам: переходы goto, номера образцов в концах out
+    goto = [{}]
+    out = [[]]
+    for number, pattern in enumerate(patterns):
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                out.append([])
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        out[state].append(number)
+
+    # Суффиксные ссылки обходом в ширину; переходы сразу достраиваются
+    # до полного автомата, чтобы при поиске не ходить по ссылкам
+    fail = [0] * len(goto)
+    delta = [None] * len(goto)
+    delta[0] = dict(goto[0])
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        link = fail[state]
+        out[state] = out[state] + out[link]
+        delta[state] = dict(delta[link])
+        delta[state].update(goto[state])
+        for char, child in goto[state].items():
+            fail[child] = delta[link].get(char, 0)
+            queue.append(child)
+
+    return delta, out
+
+
+def aho_corasick_search(text, automaton, patterns):
+
+    # Все вхождения всех образцов за один проход: список (позиция, номер образца)
+    delta, out = automaton
+    occurrences = []
+    state = 0
+    for i, char in enumerate(text):
+        state = delta[state].get(char, 0)
+        if out[state]:
+            for number in out[state]:
+                occurrences.append((i - len(patterns[number]) + 1, number))
+    return occurrences
+
+
+def classify_lines(lines, levels=LEVELS):
+
+    # Строки журнала по уровням: {уровень: [(номер строки, строка), ...]}
+    patterns = [f"({level})" for level in levels]
+    automaton = build_automaton(patterns)
+    delta, out = automaton
+    found = {level: [] for level in levels}
+
+    for line_num, line in enumerate(lines, 1):
+        state = 0
+        seen = set()
+        for char in line:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                seen.update(out[state])
+        for number in sorted(seen):
+            found[levels[number]].append((line_num, line))
+
+    return found
+
+
+def classify_lines_bmh(lines, levels=LEVELS):
+
+    # То же, что classify_lines, но отдельным проходом BMH на каждый уровень
+    found = {}
+    for level in levels:
+        pattern = f"({level})"
+        found[level] = [(line_num, line) for line_num, line in enumerate(lines, 1)
+                        if bmh_search(line, pattern)]
+    return found
+
+
+def benchmark(lines, repeat=5):
+
+    # Лучшее время из repeat запусков для каждого способа
+    results = {}
+    for name, func in (("Ахо-Корасик, один проход", classify_lines),
+                       ("BMH, пять проходов", classify_lines_bmh)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = func(lines)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, found)
+
+    (ac_time, ac_found), (bmh_time, bmh_found) = results.values()
+    for name, (elapsed, _) in results.items():
+        print(f"{name}: {elapsed * 1000:.2f} мс")
+    print(f"Ускорение: {bmh_time / ac_time:.2f}x")
+    print(f"Результаты совпадают: {ac_found == bmh_found}")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    log_file = args[0] if args else '/var/log/Xorg.0.log'
+
+    if not os.path.exists(log_file):
+        print(f"Файл {log_file} не найден")
+        return
+
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='ignore') as file:
+            lines = file.readlines()
+    except PermissionError:
+        print("Недостаточно прав для чтения файла")
+        return
+
+    if '--bench' in sys.argv:
+        benchmark(lines)
+        return
+
+    found = classify_lines(lines)
+    for level in LEVELS:
+        print(f"\n({level}): {len(found[level])}")
+        if '--count' not in sys.argv:
+            for line_num, line in found[level]:
+                print(f"Строка {line_num}: {line.strip()}")
+
+    print("\nНайдено сообщений:")
+    for level in LEVELS:
+        print(f"({level}) {len(found[level])}")
+
+if __name__ == "__main__":
+    main()
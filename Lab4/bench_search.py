@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import random
+
+from engines import ALGORITHMS, search
+
+
+LOG_FILES = ['/var/log/Xorg.0.log',
+             os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Xorg.0.log')]
+PATTERN_LENGTHS = [4, 16, 64]
+
+
+def load_log(size):
+
+    # Журнал Xorg, повторенный до size символов
+    for log_file in LOG_FILES:
+        if os.path.exists(log_file):
+            with open(log_file, 'r', encoding='utf-8', errors='ignore') as file:
+                text = file.read()
+            return (text * (size // len(text) + 1))[:size]
+    return None
+
+
+def make_cases(size, seed=1):
+
+    # Наборы (название, текст, образец)
+    rng = random.Random(seed)
+    cases = []
+
+    log = load_log(size)
+    if log is not None:
+        for pattern in ['(WW)', '(II)', 'Loading extension', '(EE) no such module']:
+            cases.append((f"Xorg: {pattern}", log, pattern))
+
+    # Худший случай для посимвольных сравнений: aaaa...ab в тексте из a
+    for m in PATTERN_LENGTHS:
+        cases.append((f"a...ab, m={m}", 'a' * size, 'a' * (m - 1) + 'b'))
+
+    # Случайный текст: образец берем из текста, чтобы были вхождения
+    for alphabet in ['acgt', 'abcdefghijklmnopqrstuvwxyz']:
+        text = ''.join(rng.choice(alphabet) for _ in range(size))
+        for m in PATTERN_LENGTHS:
+            start = rng.randrange(size - m)
+            cases.append((f"случайный |A|={len(alphabet)}, m={m}", text, text[start:start + m]))
+
+    return cases
+
+
+def benchmark(cases, algos, repeat=3):
+
+    # Лучшее время из repeat запусков; результат сверяется с find
+    print(f"{'набор':<30}" + ''.join(f"{algo:>10}" for algo in algos))
+    for name, text, pattern in cases:
+        expected = search(text, pattern, 'find')
+        row = f"{name:<30}"
+        for algo in algos:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                found = search(text, pattern, algo)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            mark = '' if found == expected else '!'
+            row += f"{best * 1000:>9.1f}{mark or ' '}"
+        print(row, flush=True)
+    print("\nВремя в мс; '!' - результат не совпал с find")
+
+
+def main():
+    # python bench_search.py [размер текста] [алгоритм ...]
+    args = sys.argv[1:]
+    size = int(args.pop(0)) if args and args[0].isdigit() else 200000
+    algos = args or list(ALGORITHMS)
+
+    unknown = [algo for algo in algos if algo not in ALGORITHMS]
+    if unknown:
+        print(f"Неизвестные алгоритмы: {', '.join(unknown)}; есть: {', '.join(ALGORITHMS)}")
+        return
+
+    benchmark(make_cases(size), algos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import re
+
+from BMH import bmh_search
+from naive import naive_search
+
+
+def kmp_search(text, pattern):
+
+    occurrences = []
+    n = len(text)
+    m = len(pattern)
+
+    # Если подстрока пустая или длиннее текста
+    if m == 0 or m > n:
+        return occurrences
+
+    # Префикс-функция: длина наибольшей грани pattern[:i + 1]
+    border = [0] * m
+    k = 0
+    for i in range(1, m):
+        while k > 0 and pattern[i] != pattern[k]:
+            k = border[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        border[i] = k
+
+    # Поиск: текст читается слева направо без возвратов
+    k = 0
+    for i in range(n):
+        while k > 0 and text[i] != pattern[k]:
+            k = border[k - 1]
+        if text[i] == pattern[k]:
+            k += 1
+        if k == m:
+            occurrences.append(i - m + 1)
+            k = border[k - 1]
+
+    return occurrences
+
+
+def bm_good_suffix_table(pattern):
+
+    # suffix[i] - длина наибольшего общего суффикса pattern[:i + 1] и pattern
+    m = len(pattern)
+    suffix = [0] * m
+    suffix[m - 1] = m
+    g = m - 1
+    f = m - 1
+    for i in range(m - 2, -1, -1):
+        if i > g and suffix[i + m - 1 - f] < i - g:
+            suffix[i] = suffix[i + m - 1 - f]
+        else:
+            if i < g:
+                g = i
+            f = i
+            while g >= 0 and pattern[g] == pattern[g + m - 1 - f]:
+                g -= 1
+            suffix[i] = f - g
+
+    # Сдвиг при несовпадении в позиции i после совпавшего суффикса
+    good_suffix = [m] * m
+    j = 0
+    for i in range(m - 1, -2, -1):
+        if i == -1 or suffix[i] == i + 1:
+            while j < m - 1 - i:
+                if good_suffix[j] == m:
+                    good_suffix[j] = m - 1 - i
+                j += 1
+    for i in range(m - 1):
+        good_suffix[m - 1 - suffix[i]] = m - 1 - i
+    return good_suffix
+
+
+def bm_search(text, pattern):
+
+    # Полный Бойер-Мур: правило плохого символа и правило хорошего суффикса
+    occurrences = []
+    n = len(text)
+    m = len(pattern)
+
+    # Если подстрока пустая или длиннее текста
+    if m == 0 or m > n:
+        return occurrences
+
+    bad_char = {}
+    for i in range(m - 1):
+        bad_char[pattern[i]] = m - 1 - i
+    good_suffix = bm_good_suffix_table(pattern)
+
+    i = 0
+    while i <= n - m:
+        j = m - 1  # начинаем сравнение с конца подстроки
+        while j >= 0 and pattern[j] == text[i + j]:
+            j -= 1
+
+        if j < 0:
+            occurrences.append(i)
+            i += good_suffix[0]  # сдвиг на период образца
+        else:
+            i += max(good_suffix[j], bad_char.get(text[i + j], m) - m + 1 + j)
+
+    return occurrences
+
+
+def maximal_suffix(pattern, reverse=False):
+
+    # Наибольший суффикс в лексикографическом порядке (обратном при reverse):
+    # возвращает (позиция перед суффиксом, период суффикса)
+    m = len(pattern)
+    ms = -1
+    j = 0
+    k = period = 1
+    while j + k < m:
+        a = pattern[j + k]
+        b = pattern[ms + k]
+        if (a > b) if reverse else (a < b):
+            j += k
+            k = 1
+            period = j - ms
+        elif a == b:
+            if k != period:
+                k += 1
+            else:
+                j += period
+                k = 1
+        else:
+            ms = j
+            j = ms + 1
+            k = period = 1
+    return ms, period
+
+
+def two_way_search(text, pattern):
+
+    # Two-Way (Крошмор-Перрен): критическое разложение образца,
+    # правая часть сравнивается слева направо, левая - справа налево;
+    # O(n) сравнений при O(1) дополнительной памяти
+    occurrences = []
+    n = len(text)
+    m = len(pattern)
+
+    # Если подстрока пустая или длиннее текста
+    if m == 0 or m > n:
+        return occurrences
+
+    # Критическая позиция - большая из двух позиций максимальных суффиксов
+    i, p = maximal_suffix(pattern)
+    j, q = maximal_suffix(pattern, reverse=True)
+    if i > j:
+        ell, period = i, p
+    else:
+        ell, period = j, q
+
+    if pattern[:ell + 1] == pattern[period:period + ell + 1]:
+        # Образец периодичен: после совпадения помним уже проверенную часть
+        pos = 0
+        memory = -1
+        while pos <= n - m:
+            i = max(ell, memory) + 1
+            while i < m and pattern[i] == text[i + pos]:
+                i += 1
+            if i >= m:
+                i = ell
+                while i > memory and pattern[i] == text[i + pos]:
+                    i -= 1
+                if i <= memory:
+                    occurrences.append(pos)
+                pos += period
+                memory = m - period - 1
+            else:
+                pos += i - ell
+                memory = -1
+    else:
+        period = max(ell + 1, m - ell - 1) + 1
+        pos = 0
+        while pos <= n - m:
+            i = ell + 1
+            while i < m and pattern[i] == text[i + pos]:
+                i += 1
+            if i >= m:
+                i = ell
+                while i >= 0 and pattern[i] == text[i + pos]:
+                    i -= 1
+                if i < 0:
+                    occurrences.append(pos)
+                pos += period
+            else:
+                pos += i - ell
+
+    return occurrences
+
+
+def find_search(text, pattern):
+
+    # Базовая линия: встроенный str.find / bytes.find
+    occurrences = []
+    if len(pattern) == 0:
+        return occurrences
+    i = text.find(pattern)
+    while i >= 0:
+        occurrences.append(i)
+        i = text.find(pattern, i + 1)
+    return occurrences
+
+
+def re_search(text, pattern):
+
+    # Базовая линия: модуль re; опережающая проверка дает и перекрытия
+    if len(pattern) == 0:
+        return []
+    regex = re.compile(b'(?=' + re.escape(pattern) + b')' if isinstance(pattern, bytes)
+                       else '(?=' + re.escape(pattern) + ')')
+    return [match.start() for match in regex.finditer(text)]
+
+
+ALGORITHMS = {
+    'naive': naive_search,
+    'bmh': bmh_search,
+    'kmp': kmp_search,
+    'bm': bm_search,
+    'two_way': two_way_search,
+    'find': find_search,
+    're': re_search,
+}
+
+
+def search(text, pattern, algo='bmh'):
+
+    # Все вхождения pattern в text (с перекрытиями) выбранным алгоритмом
+    if algo not in ALGORITHMS:
+        raise ValueError(f"Неизвестный алгоритм '{algo}', есть: {', '.join(ALGORITHMS)}")
+    return ALGORITHMS[algo](text, pattern)
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+
+from aho_corasick import LEVELS, classify_lines
+
+
+class LogFollower:
+    """Дочитывание журнала: после прошлого прохода читаются только новые байты.
+
+    В файле состояния хранятся inode, смещение конца последней полной
+    строки и номер этой строки. Смена inode - ротация журнала (новый файл
+    читается с начала), размер меньше смещения - журнал усечен.
+    """
+    def __init__(self, log_file, state_file, levels=LEVELS, chunk_size=1 << 20):
+        self.log_file = log_file
+        self.state_file = state_file
+        self.levels = levels
+        self.chunk_size = chunk_size
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.line_num = 0
+        self.load_state()
+
+    def load_state(self):
+        """Прочитать состояние прошлого прохода, если оно есть"""
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get('log_file') == os.path.abspath(self.log_file):
+            self.inode = state['inode']
+            self.offset = state['offset']
+            self.line_num = state['line']
+
+    def save_state(self):
+        """Записать состояние атомарно: через временный файл и замену"""
+        state = {'log_file': os.path.abspath(self.log_file), 'inode': self.inode,
+                 'offset': self.offset, 'line': self.line_num}
+        temp = self.state_file + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp, self.state_file)
+
+    def open_log(self):
+        """Открыть журнал и встать на сохраненное смещение"""
+        self.file = open(self.log_file, 'rb')
+        info = os.fstat(self.file.fileno())
+        if info.st_ino != self.inode or info.st_size < self.offset:
+            # Ротация или усечение: читаем новый журнал с начала
+            self.inode = info.st_ino
+            self.offset = 0
+            self.line_num = 0
+        self.file.seek(self.offset)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def read_lines(self, final=False):
+        """Новые полные строки; незаконченная последняя строка остается
+        на следующий раз (при final она считается законченной)"""
+        lines = []
+        pending = b''
+        while True:
+            chunk = self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            data = pending + chunk
+            end = data.rfind(b'\n') + 1
+            if end:
+                # Только по b'\n': splitlines делит и по \x0b, \x0c, \x85, \u2028 и др.,
+                # и номера строк расходятся с остальными программами
+                lines.extend((line + b'\n').decode('utf-8', errors='ignore')
+                             for line in data[:end - 1].split(b'\n'))
+            pending = data[end:]
+        if final and pending:
+            lines.append(pending.decode('utf-8', errors='ignore'))
+            pending = b''
+        # Смещение - конец последней полной строки
+        self.offset = self.file.tell() - len(pending)
+        self.file.seek(self.offset)
+        return lines
+
+    def classify(self, lines):
+        """Найденные строки: список (номер строки, уровень, строка)"""
+        found = classify_lines(lines, self.levels)
+        matches = [(self.line_num + line_num, level, line)
+                   for level in self.levels for line_num, line in found[level]]
+        self.line_num += len(lines)
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def poll(self):
+        """Один проход: найденные с прошлого прохода строки"""
+        if not os.path.exists(self.log_file):
+            return []
+        matches = []
+        if self.file is not None:
+            if os.stat(self.log_file).st_ino != self.inode:
+                # Журнал ротирован: дочитываем старый файл до конца
+                matches = self.classify(self.read_lines(final=True))
+                self.close()
+                self.inode = None
+            elif os.stat(self.log_file).st_size < self.offset:
+                self.close()
+        if self.file is None:
+            self.open_log()
+        matches.extend(self.classify(self.read_lines()))
+        return matches
+
+
+def main():
+    # python follow.py [журнал] [--levels=EE,WW] [--state=файл] [--once] [--interval=секунды]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    log_file = args[0] if args else '/var/log/Xorg.0.log'
+    levels = options['levels'].split(',') if options.get('levels') else LEVELS
+    state_file = options.get('state') or os.path.join(
+        os.path.expanduser('~'), '.' + os.path.basename(log_file) + '.follow')
+    interval = float(options.get('interval') or 1)
+
+    if not os.path.exists(log_file):
+        print(f"Файл {log_file} не найден")
+        return
+
+    follower = LogFollower(log_file, state_file, levels)
+    try:
+        while True:
+            try:
+                matches = follower.poll()
+            except PermissionError:
+                print("Недостаточно прав для чтения файла")
+                return
+            for line_num, level, line in matches:
+                print(f"Строка {line_num} ({level}): {line.strip()}", flush=True)
+            follower.save_state()
+            if 'once' in options:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        follower.save_state()
+    finally:
+        follower.close()
+
+if __name__ == "__main__":
+    main()
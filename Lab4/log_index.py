@@ -0,0 +1,210 @@
+import os
+import re
+import sys
+import json
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+from aho_corasick import LEVELS, build_automaton
+
+
+INDEX_MAGIC = b'XIDX'
+INDEX_VERSION = 1
+# Заголовок: сигнатура, версия, длина метаданных в JSON
+INDEX_HEADER = struct.Struct('<4sBI')
+# Метка времени в начале строки: "[     5.123]"
+TIMESTAMP = re.compile(rb'\[\s*(\d+(?:\.\d+)?)\]')
+
+
+class LogIndex:
+    """Индекс журнала Xorg на диске: строки по уровням с метками времени.
+
+    Для каждого уровня хранятся три массива одной длины: метки времени,
+    смещения строк в файле и номера строк. Строка без метки получает метку
+    предыдущей строки (-1 до первой метки). Запрос по уровню и интервалу
+    времени - двоичный поиск по меткам и чтение найденных строк по смещениям.
+    Если журнал дописан, индексируются только новые строки.
+    """
+    def __init__(self, log_file, index_file=None, chunk_size=1 << 20):
+        self.log_file = log_file
+        self.index_file = index_file or log_file + '.idx'
+        self.chunk_size = chunk_size
+        self.reset()
+
+    def reset(self):
+        """Пустой индекс"""
+        self.inode = None
+        self.offset = 0
+        self.line_num = 0
+        self.last_time = -1.0
+        self.ordered = True
+        self.entries = {level: (array('d'), array('q'), array('q')) for level in LEVELS}
+
+    def load(self):
+        """Прочитать индекс с диска; False, если его нет или он испорчен"""
+        try:
+            with open(self.index_file, 'rb') as f:
+                magic, version, meta_size = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    return False
+                meta = json.loads(f.read(meta_size))
+                entries = {}
+                for level in LEVELS:
+                    count = meta['counts'][level]
+                    columns = (array('d'), array('q'), array('q'))
+                    for column in columns:
+                        column.fromfile(f, count)
+                        if sys.byteorder == 'big':
+                            column.byteswap()
+                    entries[level] = columns
+        except (OSError, ValueError, KeyError, EOFError, struct.error):
+            return False
+
+        self.inode = meta['inode']
+        self.offset = meta['offset']
+        self.line_num = meta['line']
+        self.last_time = meta['last_time']
+        self.ordered = meta['ordered']
+        self.entries = entries
+        return True
+
+    def save(self):
+        """Записать индекс атомарно: через временный файл и замену"""
+        meta = json.dumps({
+            'log_file': os.path.abspath(self.log_file),
+            'inode': self.inode,
+            'offset': self.offset,
+            'line': self.line_num,
+            'last_time': self.last_time,
+            'ordered': self.ordered,
+            'counts': {level: len(self.entries[level][0]) for level in LEVELS},
+        }).encode('utf-8')
+        temp = self.index_file + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(meta)))
+            f.write(meta)
+            for level in LEVELS:
+                for column in self.entries[level]:
+                    if sys.byteorder == 'big':
+                        column = array(column.typecode, column)
+                        column.byteswap()
+                    column.tofile(f)
+        os.replace(temp, self.index_file)
+
+    def update(self):
+        """Привести индекс в соответствие с журналом.
+        Возвращает число проиндексированных новых строк."""
+        if not self.load():
+            self.reset()
+        info = os.stat(self.log_file)
+        if info.st_ino != self.inode or info.st_size < self.offset:
+            # Другой файл (ротация) или усеченный журнал: строим заново
+            self.reset()
+            self.inode = info.st_ino
+        if info.st_size == self.offset:
+            return 0
+
+        before = self.line_num
+        self.index_from(self.offset)
+        self.save()
+        return self.line_num - before
+
+    def index_from(self, offset):
+        """Проиндексировать полные строки журнала начиная со смещения offset"""
+        patterns = [f"({level})".encode('utf-8') for level in LEVELS]
+        delta, out = build_automaton(patterns)
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            pending = b''
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                data = pending + chunk
+                end = data.rfind(b'\n') + 1
+                pending = data[end:]
+                # Только по b'\n': splitlines делит и по одиночному \r.
+                # Без '\n' в данных (end == 0) полных строк нет вовсе
+                for line in data[:end].split(b'\n')[:-1]:
+                    self.add_line(line + b'\n', offset, delta, out)
+                    offset += len(line) + 1
+        # Незаконченная последняя строка будет проиндексирована позже
+        self.offset = offset
+
+    def add_line(self, line, offset, delta, out):
+        """Добавить строку в индекс"""
+        self.line_num += 1
+        match = TIMESTAMP.match(line)
+        if match:
+            timestamp = float(match.group(1))
+            if timestamp < self.last_time:
+                self.ordered = False
+            self.last_time = timestamp
+
+        # Уровни строки одним проходом автомата Ахо-Корасик
+        state = 0
+        seen = set()
+        for char in line:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                seen.update(out[state])
+        for number in seen:
+            times, offsets, lines = self.entries[LEVELS[number]]
+            times.append(self.last_time)
+            offsets.append(offset)
+            lines.append(self.line_num)
+
+    def query(self, level, start=None, end=None):
+        """Строки уровня level с меткой времени в [start, end]:
+        генератор (номер строки, метка времени, строка)"""
+        times, offsets, lines = self.entries[level]
+        low = float('-inf') if start is None else start
+        high = float('inf') if end is None else end
+        if self.ordered:
+            positions = range(bisect_left(times, low), bisect_right(times, high))
+        else:
+            # Метки шли не по возрастанию: двоичный поиск неприменим
+            positions = [i for i, timestamp in enumerate(times) if low <= timestamp <= high]
+
+        with open(self.log_file, 'rb') as f:
+            for i in positions:
+                f.seek(offsets[i])
+                yield lines[i], times[i], f.readline().decode('utf-8', errors='ignore')
+
+
+def main():
+    # python log_index.py [журнал] [--level=EE] [--from=3] [--to=10] [--index=файл]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    log_file = args[0] if args else '/var/log/Xorg.0.log'
+    level = options.get('level') or 'EE'
+
+    if not os.path.exists(log_file):
+        print(f"Файл {log_file} не найден")
+        return
+    if level not in LEVELS:
+        print(f"Неизвестный уровень {level}, есть: {', '.join(LEVELS)}")
+        return
+
+    index = LogIndex(log_file, options.get('index'))
+    try:
+        added = index.update()
+    except PermissionError:
+        print("Недостаточно прав для чтения файла")
+        return
+    if added:
+        print(f"Проиндексировано новых строк: {added}")
+
+    start = float(options['from']) if options.get('from') else None
+    end = float(options['to']) if options.get('to') else None
+    found_count = 0
+    for line_num, _, line in index.query(level, start, end):
+        print(f"Строка {line_num}: {line.strip()}")
+        found_count += 1
+
+    print(f"\nНайдено сообщений: {found_count}")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,44 @@
 import os
 
 
-def naive_search(text, pattern):
-
-    occurrences = []
-    n = len(text)
-    m = len(pattern)
+class NaivePattern:
+    """Образец для наивного поиска с тем же интерфейсом, что у BMHPattern"""
+    def __init__(self, pattern):
+        self.pattern = pattern
     
-    # Если подстрока пустая или длиннее текста
-    if m == 0 or m > n:
-        return occurrences
+    def finditer(self, text, start=0, end=None):
+        """Генератор позиций всех вхождений"""
+        pattern = self.pattern
+        m = len(pattern)
+        n = len(text) if end is None else min(end, len(text))
+        
+        # Если подстрока пустая или длиннее текста
+        if m == 0 or m > n:
+            return
+        
+        # Проверяем все возможные начальные позиции
+        for i in range(start, n - m + 1):
+            match = True
+            # Проверяем символы подстроки
+            for j in range(m):
+                if text[i + j] != pattern[j]:
+                    match = False
+                    break
+            if match:
+                yield i
     
-    # Проверяем все возможные начальные позиции
-    for i in range(n - m + 1):
-        match = True
-        # Проверяем символы подстроки
-        for j in range(m):
-            if text[i + j] != pattern[j]:
-                match = False
-                break
-        if match:
-            occurrences.append(i)
+    def search(self, text, start=0, end=None):
+        """Позиция первого вхождения или -1"""
+        return next(self.finditer(text, start, end), -1)
     
-    return occurrences
+    def count(self, text, start=0, end=None):
+        """Число вхождений без построения списка"""
+        return sum(1 for _ in self.finditer(text, start, end))
+
+
+def naive_search(text, pattern):
+
+    return list(NaivePattern(pattern).finditer(text))
 
 def main():
     log_file = '/var/log/Xorg.0.log'
@@ -40,9 +56,11 @@ def main():
         print("Недостаточно прав для чтения файла")
         return
     
+    # Для фильтрации строк достаточно первого вхождения
+    compiled = NaivePattern(pattern)
     found_count = 0
     for line_num, line in enumerate(lines, 1):
-        if naive_search(line, pattern):
+        if compiled.search(line) >= 0:
             print(f"Строка {line_num}: {line.strip()}")
             found_count += 1
     
@@ -0,0 +1,59 @@
+# test.py
+import os
+import tempfile
+import shutil
+from aho_corasick import LEVELS
+from log_index import LogIndex
+
+def query_all(index, level):
+    """Все найденные строки уровня: (номер строки, метка времени, строка)"""
+    return list(index.query(level))
+
+def test_log_index_partial_line():
+    """Недописанная строка индексируется только после перевода строки"""
+    print("=" * 50)
+    print("Тестирование индекса журнала с недописанной строкой")
+    print("=" * 50)
+
+    work_dir = tempfile.mkdtemp()
+    log_file = os.path.join(work_dir, 'Xorg.0.log')
+    try:
+        with open(log_file, 'wb') as f:
+            f.write(b"[     1.000] (II) Loading extension GLX\n"
+                    b"[     2.000] (EE) Failed to load module \"fbdev\"\n")
+        index = LogIndex(log_file, chunk_size=16)
+        print(f"Первое построение: {index.update()} строк")
+
+        # Запись строки оборвалась посередине
+        with open(log_file, 'ab') as f:
+            f.write(b"[     3.000] (WW) partial")
+        print(f"После недописанной строки: {index.update()} строк")
+
+        with open(log_file, 'ab') as f:
+            f.write(b" line\n[     4.000] (EE) No screens found\n")
+        print(f"После окончания строки: {index.update()} строк")
+
+        fresh = LogIndex(log_file, os.path.join(work_dir, 'fresh.idx'))
+        fresh.update()
+
+        same = all(query_all(index, level) == query_all(fresh, level)
+                   for level in LEVELS)
+        print(f"EE: {[line_num for line_num, _, _ in query_all(index, 'EE')]}")
+        if same and index.line_num == fresh.line_num == 4 and index.offset == fresh.offset:
+            print("✓ Дописанный индекс совпадает с построенным заново")
+        else:
+            print("✗ Дописанный индекс отличается от построенного заново")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print()
+
+def run_all_tests():
+    """Запуск всех тестов"""
+    test_log_index_partial_line()
+
+    print("=" * 50)
+    print("Все тесты завершены")
+    print("=" * 50)
+
+if __name__ == "__main__":
+    run_all_tests()
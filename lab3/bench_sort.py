@@ -0,0 +1,54 @@
+import sys
+import time
+import random
+
+from fast import fast_sort
+from introsort import intro_sort
+
+
+def make_inputs(n, seed=1):
+
+    # Наборы входных данных: (название, список)
+    rng = random.Random(seed)
+    return [
+        ("случайные", [rng.randrange(n * 10) for _ in range(n)]),
+        ("отсортированные", list(range(n))),
+        ("обратные", list(range(n, 0, -1))),
+        ("все равные", [7] * n),
+        ("мало разных", [rng.randrange(10) for _ in range(n)]),
+        ("почти отсортированные",
+         [i + rng.randrange(-3, 4) if rng.random() < 0.05 else i for i in range(n)]),
+    ]
+
+
+def measure(sort, data, repeat):
+
+    # Лучшее время из repeat запусков на копиях data и результат сортировки
+    best = None
+    for _ in range(repeat):
+        arr = list(data)
+        start = time.perf_counter()
+        result = sort(arr)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    # python bench_sort.py [n] [повторы]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sorts = [("fast_sort", fast_sort), ("intro_sort", intro_sort), ("sorted", sorted)]
+
+    print(f"n = {n}, время в мс (лучшее из {repeat})")
+    print(f"{'вход':<24}" + ''.join(f"{name:>12}" for name, _ in sorts))
+    for name, data in make_inputs(n):
+        expected = sorted(data)
+        row = f"{name:<24}"
+        for _, sort in sorts:
+            elapsed, arr = measure(sort, data, repeat)
+            row += f"{elapsed * 1000:>11.1f}" + (' ' if arr == expected else '!')
+        print(row, flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import time
+import random
+
+from vstavka import vstav, vstav_binary, shell_sort, vstav_auto
+
+
+class Counted:
+    # Обертка над числом, считающая сравнения
+    comparisons = 0
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        Counted.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        Counted.comparisons += 1
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def make_inputs(n, seed=1):
+
+    # Наборы входных данных: (название, список)
+    rng = random.Random(seed)
+    data = [rng.random() for _ in range(n)]
+
+    near = sorted(data)
+    for _ in range(n // 20):   # соседние перестановки
+        i = rng.randrange(n)
+        j = min(n - 1, i + rng.randrange(1, 5))
+        near[i], near[j] = near[j], near[i]
+
+    far = sorted(data)
+    for _ in range(max(1, n // 100)):   # редкие дальние перестановки
+        i, j = rng.randrange(n), rng.randrange(n)
+        far[i], far[j] = far[j], far[i]
+
+    return [
+        ("случайные", data),
+        ("почти отсортированные", near),
+        ("дальние перестановки", far),
+        ("две серии", sorted(data[:n // 2]) + sorted(data[n // 2:])),
+        ("обратные", sorted(data, reverse=True)),
+    ]
+
+
+def main():
+    # python bench_vstav.py [n]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sorts = [vstav, vstav_binary, shell_sort, vstav_auto]
+
+    print(f"n = {n}: время в мс / тысячи сравнений")
+    print(f"{'вход':<24}" + ''.join(f"{sort.__name__:>20}" for sort in sorts))
+    for name, data in make_inputs(n):
+        expected = sorted(data)
+        row = f"{name:<24}"
+        for sort in sorts:
+            arr = [Counted(value) for value in data]
+            Counted.comparisons = 0
+            start = time.perf_counter()
+            sort(arr)
+            elapsed = time.perf_counter() - start
+            mark = ' ' if [item.value for item in arr] == expected else '!'
+            row += f"{elapsed * 1000:>11.1f} /{Counted.comparisons / 1000:>6.0f}{mark}"
+        print(row, flush=True)
+    print("\nВремя с учетом обертки, считающей сравнения")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import os
+import sys
+import heapq
+import shutil
+import tempfile
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+from fast import fast_sort
+from introsort import intro_sort
+
+
+SORTS = {'fast': fast_sort, 'intro': intro_sort}
+# Во сколько раз список ключей в памяти больше их текста на диске:
+# строка-токен, объект int и указатель в списке на 10-значный ключ
+MEMORY_FACTOR = 12
+READ_BLOCK = 1 << 20            # блок чтения входного файла
+MIN_BUFFER = 64 * 1024          # наименьший буфер чтения серии при слиянии
+MAX_FAN_IN = 128                # больше серий за раз не сливаем
+
+
+# parse_size и parallel_map повторяют lab5/lab5.py: каждая лабораторная запускается сама по себе
+def parse_size(text):
+    # "64M", "1G", "500K" или число байт
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def read_chunks(f, chunk_bytes):
+    # Списки токенов, в сумме около chunk_bytes текста каждый.
+    # Токен, разрезанный границей блока, переходит в следующий блок
+    block_size = min(READ_BLOCK, chunk_bytes)
+    tokens = []
+    size = 0
+    pending = ''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        block = pending + block
+        parts = block.split()
+        pending = parts.pop() if parts and not block[-1].isspace() else ''
+        tokens.extend(parts)
+        size += len(block) - len(pending)
+        if size >= chunk_bytes:
+            yield tokens
+            tokens = []
+            size = 0
+    if pending:
+        tokens.append(pending)
+    if tokens:
+        yield tokens
+
+
+def sort_run(tokens, path, numeric, engine):
+    # Отсортировать часть и записать серию: по ключу в строке
+    keys = list(map(int, tokens)) if numeric else tokens
+    del tokens
+    SORTS[engine](keys)
+    with open(path, 'w', buffering=READ_BLOCK) as f:
+        f.writelines(f"{key}\n" for key in keys)
+    return path
+
+
+def parallel_map(func, tasks, workers):
+    # map по процессам с сохранением порядка и ограниченной очередью задач
+    if workers == 1:
+        for args in tasks:
+            yield func(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for args in tasks:
+            pending.append(pool.submit(func, *args))
+            # Не больше одной части на процесс: иначе бюджет памяти превышен
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def merge_runs(paths, output, numeric, buffer_size):
+    # k-путевое слияние серий кучей; строки пишутся без переразбора
+    files = [open(path, buffering=buffer_size) for path in paths]
+    try:
+        key = int if numeric else str.rstrip
+        with open(output, 'w', buffering=buffer_size) as out:
+            out.writelines(heapq.merge(*files, key=key))
+    finally:
+        for f in files:
+            f.close()
+
+
+def external_sort(input_file, output_file, memory=64 << 20, workers=1,
+                  numeric=True, engine='intro', temp_dir=None):
+    """Внешняя сортировка файла ключей, разделенных пробельными символами.
+
+    Файл читается частями так, чтобы часть в памяти укладывалась в бюджет
+    memory (при workers процессах - memory / workers на процесс). Каждая
+    часть сортируется engine ('intro' или 'fast'; у fast_sort разбиение Ломуто,
+    на повторяющихся ключах время квадратичное) и пишется во временную
+    серию. Серии сливаются кучей по MAX_FAN_IN за проход, пока не останется
+    одна - результат, по ключу в строке. Возвращает число серий.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_bytes = max(1, memory // workers // MEMORY_FACTOR)
+    work_dir = tempfile.mkdtemp(prefix='extsort-', dir=temp_dir)
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            tasks = ((tokens, os.path.join(work_dir, f"run{i}"), numeric, engine)
+                     for i, tokens in enumerate(read_chunks(f, chunk_bytes)))
+            runs = list(parallel_map(sort_run, tasks, workers))
+        run_count = len(runs)
+
+        if not runs:
+            open(output_file, 'w').close()
+            return 0
+        # Буфер на каждую серию и на выход; серий за проход - сколько влезет
+        fan_in = max(2, min(MAX_FAN_IN, memory // MIN_BUFFER - 1))
+        level = 0
+        while len(runs) > fan_in:
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                path = os.path.join(work_dir, f"merge{level}_{i}")
+                merge_runs(group, path, numeric, max(MIN_BUFFER, memory // (len(group) + 1)))
+                for old in group:
+                    os.remove(old)
+                merged.append(path)
+            runs = merged
+            level += 1
+        merge_runs(runs, output_file, numeric, max(MIN_BUFFER, memory // (len(runs) + 1)))
+        return run_count
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def check_sorted(path, numeric=True):
+    # Проверка результата одним проходом, без загрузки в память
+    previous = None
+    count = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key = int(line) if numeric else line.rstrip()
+            if previous is not None and key < previous:
+                return False, count
+            previous = key
+            count += 1
+    return True, count
+
+
+def main():
+    # python external.py вход выход [--memory=64M] [--workers=N] [--str]
+    #                                [--engine=intro|fast] [--tmp=каталог] [--check]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    if len(args) != 2:
+        print("Использование: python external.py вход выход [--memory=64M] [--workers=N] "
+              "[--str] [--engine=intro|fast] [--tmp=каталог] [--check]")
+        return
+    input_file, output_file = args
+    if not os.path.exists(input_file):
+        print(f"Файл {input_file} не найден")
+        return
+
+    numeric = 'str' not in options
+    runs = external_sort(input_file, output_file,
+                         memory=parse_size(options.get('memory') or '64M'),
+                         workers=int(options.get('workers') or 1),
+                         numeric=numeric,
+                         engine=options.get('engine') or 'intro',
+                         temp_dir=options.get('tmp') or None)
+    print(f"Серий: {runs}")
+    if 'check' in options:
+        ok, count = check_sorted(output_file, numeric)
+        print(f"Ключей: {count}, порядок {'верный' if ok else 'НАРУШЕН'}")
+
+if __name__ == "__main__":
+    main()
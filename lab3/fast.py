@@ -1,12 +1,11 @@
-m = list(map(int, input().split()))
-s = input().split()
-
-
-def fast_sort(arr):
-    if len(arr) < 1:
+def fast_sort(arr, low=0, high=None):
+    # low, high - границы сортируемого участка (по умолчанию весь массив)
+    if high is None:
+        high = len(arr) - 1
+    if high <= low:
         return arr
     
-    stack = [(0, len(arr) -1)]
+    stack = [(low, high)]
     while stack:
         low, high = stack.pop()
 
@@ -32,9 +31,13 @@ def part_iter(arr, low, high):
     return i + 1
  
 
-print('\n___result___')
-fast_sort(m)
-fast_sort(s)
+if __name__ == "__main__":
+    m = list(map(int, input().split()))
+    s = input().split()
+
+    print('\n___result___')
+    fast_sort(m)
+    fast_sort(s)
 
-print(*m)
-print(*s)
\ No newline at end of file
+    print(*m)
+    print(*s)
\ No newline at end of file
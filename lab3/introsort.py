@@ -0,0 +1,120 @@
+from vstavka import vstav
+
+
+INSERTION_CUTOFF = 16   # участки не длиннее сортируем вставками
+NINTHER_CUTOFF = 40     # с этой длины опорный - медиана из девяти
+
+
+def median3(arr, a, b, c):
+    # Индекс медианы из arr[a], arr[b], arr[c]
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+
+def choose_pivot(arr, low, high):
+    # Медиана трех на коротких участках, ниндер Тьюки (медиана медиан
+    # трех троек) на длинных - меньше шансов попасть на плохой опорный
+    mid = (low + high) // 2
+    if high - low + 1 < NINTHER_CUTOFF:
+        return arr[median3(arr, low, mid, high)]
+    step = (high - low + 1) // 8
+    a = median3(arr, low, low + step, low + 2 * step)
+    b = median3(arr, mid - step, mid, mid + step)
+    c = median3(arr, high - 2 * step, high - step, high)
+    return arr[median3(arr, a, b, c)]
+
+
+def partition3(arr, low, high, pivot):
+    # Разбиение Дейкстры (голландский флаг) на < pivot, == pivot, > pivot.
+    # Возвращает границы средней части lt, gt: arr[lt..gt] == pivot.
+    # part_iter из fast.py не подходит: разбиение Ломуто отправляет все
+    # равные опорному в одну часть, и на повторяющихся ключах глубина
+    # растет линейно - introsort уходил бы в heap_sort на каждом таком участке
+    lt = low
+    i = low
+    gt = high
+    while i <= gt:
+        if arr[i] < pivot:
+            arr[lt], arr[i] = arr[i], arr[lt]
+            lt += 1
+            i += 1
+        elif pivot < arr[i]:
+            arr[i], arr[gt] = arr[gt], arr[i]
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def heap_sort(arr, low, high):
+    # Пирамидальная сортировка участка arr[low..high]: O(n log n) всегда
+    n = high - low + 1
+
+    def sift_down(root, size):
+        item = arr[low + root]
+        child = 2 * root + 1
+        while child < size:
+            if child + 1 < size and arr[low + child] < arr[low + child + 1]:
+                child += 1
+            if not item < arr[low + child]:
+                break
+            arr[low + root] = arr[low + child]
+            root = child
+            child = 2 * root + 1
+        arr[low + root] = item
+
+    for root in range(n // 2 - 1, -1, -1):
+        sift_down(root, n)
+    for end in range(n - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        sift_down(0, end)
+
+
+def intro_sort(arr):
+    # Интроспективная сортировка: быстрая сортировка с трехчастным
+    # разбиением, вставки на коротких участках и пирамидальная сортировка,
+    # если глубина разбиений превысила 2*log2(n)
+    if len(arr) < 2:
+        return arr
+
+    max_depth = 2 * len(arr).bit_length()
+    stack = [(0, len(arr) - 1, max_depth)]
+    while stack:
+        low, high, depth = stack.pop()
+
+        while high - low + 1 > INSERTION_CUTOFF:
+            if depth == 0:
+                heap_sort(arr, low, high)
+                break
+            depth -= 1
+
+            lt, gt = partition3(arr, low, high, choose_pivot(arr, low, high))
+            # Большую часть откладываем в стек, меньшую обрабатываем сразу:
+            # в стеке не больше log2(n) участков
+            if lt - low < high - gt:
+                stack.append((gt + 1, high, depth))
+                high = lt - 1
+            else:
+                stack.append((low, lt - 1, depth))
+                low = gt + 1
+        else:
+            vstav(arr, low, high)
+
+    return arr
+
+
+if __name__ == "__main__":
+    m = list(map(int, input().split()))
+    s = input().split()
+
+    print('\n___result___')
+    intro_sort(m)
+    intro_sort(s)
+
+    print(*m)
+    print(*s)
@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from introsort import choose_pivot, partition3, intro_sort
+
+
+PARALLEL_CUTOFF = 50000     # участки короче сортируем в своем процессе
+TASKS_PER_WORKER = 4        # участков на процесс: выравнивает неравные части
+
+
+def split_ranges(arr, parts, min_size):
+    # Верхние уровни быстрой сортировки последовательно: делим самый
+    # большой участок трехчастным разбиением, пока участков меньше parts и
+    # он не короче min_size. Возвращает непересекающиеся участки (low, high).
+    # Равные опорному остаются между участками на своих местах, поэтому
+    # повторяющиеся ключи не делают части неравными, как у part_iter
+    ranges = [(0, len(arr) - 1)]
+    while ranges and len(ranges) < parts:
+        ranges.sort(key=lambda r: r[1] - r[0])
+        low, high = ranges[-1]
+        if high - low + 1 < min_size:
+            break
+        ranges.pop()
+        lt, gt = partition3(arr, low, high, choose_pivot(arr, low, high))
+        if low < lt - 1:
+            ranges.append((low, lt - 1))
+        if gt + 1 < high:
+            ranges.append((gt + 1, high))
+    return ranges
+
+
+def sort_shared(name, length, low, high):
+    # Рабочий процесс: подключиться к общей памяти и отсортировать участок.
+    # Участок копируется в список int, сортируется intro_sort и записывается
+    # обратно; другие процессы пишут в другие участки
+    shm = shared_memory.SharedMemory(name=name)
+    view = None
+    try:
+        view = shm.buf[:length * 8].cast('q')
+        part = view[low:high + 1].tolist()
+        intro_sort(part)
+        view[low:high + 1] = array('q', part)
+    finally:
+        # Пока жив view, close() бросает BufferError и скрывает исходную ошибку
+        if view is not None:
+            view.release()
+        shm.close()
+    return high - low + 1
+
+
+def parallel_fast_sort(arr, workers=None, cutoff=PARALLEL_CUTOFF):
+    """Быстрая сортировка списка целых на нескольких процессах.
+
+    Верхние уровни разбиения выполняются здесь, затем массив один раз
+    копируется в общую память (int64), и участки сортируются процессами
+    без передачи данных через pickle. Участки сортирует intro_sort: у
+    fast_sort разбиение Ломуто, на повторяющихся ключах оно квадратично.
+    Короткий массив, один процесс или значения вне int64 - intro_sort здесь.
+    """
+    workers = workers or os.cpu_count() or 1
+    n = len(arr)
+    if workers == 1 or n < cutoff:
+        return intro_sort(arr)
+
+    ranges = split_ranges(arr, workers * TASKS_PER_WORKER, cutoff)
+    try:
+        typed = array('q', arr)
+    except (TypeError, OverflowError):
+        # Разбиение уже сделано, досортировываем участки здесь
+        for low, high in ranges:
+            arr[low:high + 1] = intro_sort(arr[low:high + 1])
+        return arr
+    shm = shared_memory.SharedMemory(create=True, size=n * 8)
+    view = None
+    try:
+        view = shm.buf[:n * 8].cast('q')
+        view[:] = typed
+        del typed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Длинные участки первыми: меньше простой в конце
+            ranges.sort(key=lambda r: r[0] - r[1])
+            jobs = [pool.submit(sort_shared, shm.name, n, low, high) for low, high in ranges]
+            for job in jobs:
+                job.result()
+        arr[:] = view.tolist()
+    finally:
+        if view is not None:
+            view.release()
+        shm.close()
+        shm.unlink()
+    return arr
+
+
+def benchmark(n, repeat=3, seed=1):
+
+    # Ускорение относительно intro_sort в одном процессе: участки сортирует
+    # тот же intro_sort, так что число отражает только распараллеливание
+    rng = random.Random(seed)
+    data = [rng.randrange(-10 ** 9, 10 ** 9) for _ in range(n)]
+    expected = sorted(data)
+    cores = os.cpu_count() or 1
+    # Один процесс - это и есть intro_sort в строке базы
+    counts = sorted({2, 4, cores, 2 * cores} - {1})
+
+    def best_of(sort):
+        best = None
+        for _ in range(repeat):
+            arr = list(data)
+            start = time.perf_counter()
+            sort(arr)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, arr
+
+    base, arr = best_of(intro_sort)
+    print(f"n = {n}, ядер: {cores}, лучшее из {repeat}")
+    print(f"{'процессов':<12}{'мс':>10}{'ускорение':>12}")
+    print(f"{'intro_sort':<12}{base * 1000:>10.1f}{1:>12.2f}{' ' if arr == expected else '!'}")
+    for workers in counts:
+        elapsed, arr = best_of(lambda a: parallel_fast_sort(a, workers))
+        mark = ' ' if arr == expected else '!'
+        print(f"{workers:<12}{elapsed * 1000:>10.1f}{base / elapsed:>12.2f}{mark}", flush=True)
+
+
+def main():
+    # python parallel.py [--workers=N] < числа    или    python parallel.py --bench[=n]
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    if 'bench' in options:
+        benchmark(int(options['bench'] or 1000000))
+        return
+
+    m = list(map(int, sys.stdin.read().split()))
+    parallel_fast_sort(m, int(options.get('workers') or 0) or None)
+    print(' '.join(map(str, m)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import sys
+import time
+import random
+from array import array
+from itertools import chain
+
+from fast import fast_sort
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DIGIT_BITS = 11                  # разряд поразрядной сортировки без NumPy
+NUMPY_DIGIT_BITS = 16            # разряд с NumPy: argsort по uint16 - это radix sort на C
+SIGN_BIT = 1 << 63               # инверсия знака переводит int64 в упорядоченный uint64
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def read_numbers(text):
+    # Целые числа из текста, разделенные пробелами и переводами строк:
+    # сразу в типизированный массив, без списка объектов int.
+    # Число вне int64 - OverflowError на обоих путях
+    if np is None:
+        return array('q', map(int, text.split()))
+    if not text.strip():
+        # fromstring на пустом тексте возвращает [0]
+        return np.empty(0, dtype=np.int64)
+    arr = np.fromstring(text, dtype=np.int64, sep=' ')
+    # fromstring молча заменяет число вне int64 на границу типа:
+    # если граница встретилась, разбираем текст точно
+    if len(arr) and (arr.max() == INT64_MAX or arr.min() == INT64_MIN):
+        array('q', map(int, text.split()))   #OverflowError, если число и правда вне int64
+    return arr
+
+
+def radix_sort_array(arr):
+    # Поразрядная сортировка LSD массива array('q') на месте.
+    # Ключ - смещение от минимума, поэтому отрицательные числа не мешают,
+    # а число проходов определяется размахом значений, а не шириной типа
+    if len(arr) < 2:
+        return arr
+    low = min(arr)
+    span = max(arr) - low
+    mask = (1 << DIGIT_BITS) - 1
+    shift = 0
+    while span >> shift:
+        buckets = [[] for _ in range(mask + 1)]
+        for value in arr:
+            buckets[(value - low) >> shift & mask].append(value)
+        arr[:] = array('q', chain.from_iterable(buckets))   #проход устойчив
+        shift += DIGIT_BITS
+    return arr
+
+
+def radix_sort_numpy(arr):
+    # Та же LSD-сортировка векторно: на каждом разряде устойчивая
+    # перестановка ключей по 16-битной цифре. Возвращает новый массив int64
+    if len(arr) < 2:
+        return arr.copy()
+    keys = arr.astype(np.int64).view(np.uint64) ^ np.uint64(SIGN_BIT)
+    low = keys.min()
+    keys -= low
+    span = int(keys.max())
+    mask = np.uint64((1 << NUMPY_DIGIT_BITS) - 1)
+    shift = 0
+    while span >> shift:
+        digit = ((keys >> np.uint64(shift)) & mask).astype(np.uint16)
+        keys = keys[np.argsort(digit, kind='stable')]
+        shift += NUMPY_DIGIT_BITS
+    keys += low
+    return (keys ^ np.uint64(SIGN_BIT)).view(np.int64)
+
+
+def numeric_sort(arr):
+    # Сортировка числового массива подходящим способом
+    if np is not None and isinstance(arr, np.ndarray):
+        return radix_sort_numpy(arr)
+    return radix_sort_array(arr)
+
+
+def format_numbers(arr):
+    # Одна строка через пробел, одним join
+    return ' '.join(map(str, arr.tolist()))
+
+
+def check(text, result):
+    # Сверка с fast_sort по исходному тексту, разобранному в int Python:
+    # так ловятся и ошибки разбора, а не только сортировки
+    return fast_sort(list(map(int, text.split()))) == result.tolist()
+
+
+def benchmark(n, seed=1):
+
+    # Чтение, сортировка и вывод n случайных чисел разными путями
+    rng = random.Random(seed)
+    text = ' '.join(str(rng.randrange(-10 ** 9, 10 ** 9)) for _ in range(n)) + '\n'
+    paths = [("fast_sort, список int",
+              lambda t: list(map(int, t.split())), fast_sort)]
+    paths.append(("LSD, array('q')",
+                  lambda t: array('q', map(int, t.split())), radix_sort_array))
+    if np is not None:
+        paths.append(("LSD, NumPy", read_numbers, radix_sort_numpy))
+        paths.append(("np.sort", read_numbers, np.sort))
+
+    print(f"n = {n}, время в мс")
+    print(f"{'путь':<24}{'чтение':>10}{'сортировка':>12}{'вывод':>10}")
+    expected = None
+    for name, read, sort in paths:
+        start = time.perf_counter()
+        arr = read(text)
+        parsed = time.perf_counter()
+        result = sort(arr)
+        if result is None:
+            result = arr
+        ordered = time.perf_counter()
+        line = ' '.join(map(str, result)) if isinstance(result, list) else format_numbers(result)
+        done = time.perf_counter()
+        expected = expected or line
+        mark = ' ' if line == expected else '!'
+        print(f"{name:<24}{(parsed - start) * 1000:>10.1f}"
+              f"{(ordered - parsed) * 1000:>12.1f}{(done - ordered) * 1000:>10.1f}{mark}",
+              flush=True)
+
+
+def main():
+    # python radix.py [--check] [--bench=n] < числа
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    if 'bench' in options:
+        benchmark(int(options['bench'] or 1000000))
+        return
+
+    text = sys.stdin.read()
+    try:
+        arr = read_numbers(text)
+    except (ValueError, OverflowError) as e:
+        print(f"Ошибка во входных данных: {e}", file=sys.stderr)
+        sys.exit(1)
+    result = numeric_sort(arr)
+    print(format_numbers(result))
+    if 'check' in options:
+        print("Совпадает с fast_sort:", check(text, result), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
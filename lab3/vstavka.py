@@ -1,20 +1,115 @@
-m = list(map(int, input().split()))
-s = input().split()
+from bisect import bisect_right
+from operator import gt
+import random
 
 
-def vstav(arr):
-    for i in range(1, len(arr)):   #начинаем со 2-го, 1-ый уже отсортирован
+# Шаги Шелла по Циуре; дальше - умножение на 2.25
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701]
+# Участки не длиннее сортируем простыми вставками без пробы
+PROBE_CUTOFF = 32
+# Двоичные вставки сдвигают срезами по элементу на инверсию; пока инверсий
+# не больше MOVE_BUDGET * n, это дешевле проходов Шелла
+MOVE_BUDGET = 200
+
+
+def vstav(arr, low=0, high=None):
+    # low, high - границы сортируемого участка (по умолчанию весь массив)
+    if high is None:
+        high = len(arr) - 1
+    for i in range(low + 1, high + 1):   #начинаем со 2-го, 1-ый уже отсортирован
         key = arr[i]   #текущий элемент, который мы хотим вставить
         j = i - 1   #индекс последнего элемента из отсортированной части
-        while j >= 0 and arr[j] > key:  #cдвигаем элементы отсортированной части вправо, пока не найдем правильную позицию для key
+        while j >= low and arr[j] > key:  #cдвигаем элементы отсортированной части вправо, пока не найдем правильную позицию для key
             arr[j+1] = arr[j]   #сдвигаем элемент вправо
             j -= 1   #переходим к следующему элементу слева
         arr[j+1] = key   #вставляем key на правильную позицию
 
-print('\n___result___')
 
-vstav(m)
-vstav(s)
+def vstav_binary(arr, low=0, high=None):
+    # Вставки с двоичным поиском места: O(n log n) сравнений,
+    # сдвиг отсортированной части - одно присваивание среза
+    if high is None:
+        high = len(arr) - 1
+    for i in range(low + 1, high + 1):
+        key = arr[i]
+        if not key < arr[i - 1]:
+            continue   #уже на месте: частый случай на почти упорядоченных данных
+        pos = bisect_right(arr, key, low, i)   #правее равных - сортировка устойчива
+        if pos < i:
+            arr[pos + 1:i + 1] = arr[pos:i]
+            arr[pos] = key
+
+
+def shell_gaps(n):
+    # Шаги Циуры меньше n, по убыванию
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] * 2.25 < n:
+        gaps.append(int(gaps[-1] * 2.25))
+    return [gap for gap in reversed(gaps) if gap < n] or [1]
+
+
+def shell_sort(arr, low=0, high=None):
+    # Сортировка Шелла: вставки с шагом gap, последний проход - обычные вставки
+    if high is None:
+        high = len(arr) - 1
+    for gap in shell_gaps(high - low + 1):
+        for i in range(low + gap, high + 1):
+            key = arr[i]
+            j = i - gap
+            while j >= low and arr[j] > key:
+                arr[j + gap] = arr[j]
+                j -= gap
+            arr[j + gap] = key
+
+
+def presortedness(arr, low=0, high=None, samples=64):
+    # Проба упорядоченности: (число спусков arr[i] > arr[i + 1],
+    # оценка доли инверсий по samples случайным парам)
+    if high is None:
+        high = len(arr) - 1
+    if high <= low:
+        return 0, 0.0
+    descents = sum(map(gt, arr[low:high], arr[low + 1:high + 1]))
+    rng = random.Random(high - low)   #проба воспроизводима
+    inverted = 0
+    for _ in range(samples):
+        i = rng.randint(low, high)
+        j = rng.randint(low, high)
+        if i > j:
+            i, j = j, i
+        if arr[i] > arr[j]:
+            inverted += 1
+    return descents, inverted / samples
+
+
+def vstav_auto(arr, low=0, high=None):
+    # Выбор сортировки по пробе: короткие участки - простые вставки,
+    # мало инверсий - двоичные вставки (сдвиги срезами дешевы),
+    # много инверсий - Шелл
+    if high is None:
+        high = len(arr) - 1
+    n = high - low + 1
+    if n <= PROBE_CUTOFF:
+        vstav(arr, low, high)
+        return
+
+    descents, inversions = presortedness(arr, low, high)
+    if descents == 0:
+        return
+    if inversions * n * (n - 1) / 2 <= MOVE_BUDGET * n:
+        vstav_binary(arr, low, high)
+    else:
+        shell_sort(arr, low, high)
+
+
+if __name__ == "__main__":
+    m = list(map(int, input().split()))
+    s = input().split()
+
+    print('\n___result___')
+
+    vstav(m)
+    vstav(s)
 
-print(*m)
-print(*s)
\ No newline at end of file
+    print(*m)
+    print(*s)
\ No newline at end of file
@@ -0,0 +1,339 @@
+# bench.py
+"""Замеры скорости архиватора по стадиям.
+
+    python bench.py run [результат.json] [--max=100M] [--corpus=DIR] [--stages=mtf,compress]
+                        [--repeat=3]
+                        [--blocks=1M] [--bwt] [--rle] [--coder=canonical]
+    python bench.py compare старый.json новый.json [--threshold=5]
+
+Каждая стадия запускается в отдельном процессе: так пиковый RSS относится
+только к ней. Результат - JSON со скоростью (МБ/с по исходному размеру),
+пиковым RSS и степенью сжатия (SSR) для каждого файла корпуса и стадии.
+"""
+import sys
+import os
+import io
+import json
+import time
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import platform
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from lab5 import (MTFEncoder, VitterEncoder, VitterDecoder, make_compressor,
+                  parse_args, parse_size)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+XORG_LOG = os.path.join(ROOT, 'Xorg.0.log')
+TEXT_SOURCES = [os.path.join(ROOT, 'lab2', 'README.md'), os.path.join(ROOT, 'lab3', 'l3.md')]
+
+XORG_SIZES = ['1K', '64K', '1M', '10M', '100M']
+OTHER_SIZE = '1M'
+STAGES = ['mtf', 'vitter_encode', 'vitter_decode', 'compress', 'decompress']
+# Стадия -> стадия, чей результат она читает
+PREREQUISITES = {'vitter_encode': 'mtf', 'vitter_decode': 'vitter_encode',
+                 'decompress': 'compress'}
+# Опции архиватора, которые передаются стадиям compress/decompress
+COMPRESSOR_OPTIONS = ['blocks', 'workers', 'bwt', 'rle', 'coder']
+
+def repeat_to_size(sample, size):
+    """Повторить sample до размера size"""
+    return (sample * (size // len(sample) + 1))[:size]
+
+def make_text(size, seed=1):
+    """Текст из слов описаний лабораторных, выбранных случайно"""
+    words = []
+    for path in TEXT_SOURCES:
+        with open(path, 'rb') as f:
+            words.extend(re.findall(rb'[^\s#*`|]+', f.read()))
+    rng = random.Random(seed)
+    out = bytearray()
+    while len(out) < size:
+        line = b' '.join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+        out += line + b'\n'
+    return bytes(out[:size])
+
+def build_corpus(directory, max_size=None):
+    """Создать недостающие файлы корпуса, вернуть список (имя, путь)"""
+    with open(XORG_LOG, 'rb') as f:
+        xorg = f.read()
+
+    generators = []
+    for text in XORG_SIZES:
+        size = parse_size(text)
+        generators.append((f'xorg-{text}', size, lambda size: repeat_to_size(xorg, size)))
+    size = parse_size(OTHER_SIZE)
+    generators.append((f'random-{OTHER_SIZE}', size, lambda size: random.Random(1).randbytes(size)))
+    generators.append((f'zeros-{OTHER_SIZE}', size, bytes))
+    generators.append((f'text-{OTHER_SIZE}', size, make_text))
+
+    corpus = []
+    os.makedirs(directory, exist_ok=True)
+    for name, size, generate in generators:
+        if max_size is not None and size > max_size:
+            continue
+        path = os.path.join(directory, name)
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            with open(path, 'wb') as f:
+                f.write(generate(size))
+        corpus.append((name, path))
+    return corpus
+
+def peak_rss_kb():
+    """Пиковый RSS текущего процесса в КБ (None, если не узнать)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, на Linux - в килобайтах
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run_stage(stage, source, work, options):
+    """Выполнить стадию в текущем процессе.
+
+    Промежуточные данные лежат в файлах work + '.mtf', '.vit', '.vts':
+    каждая стадия читает результат предыдущей. Возвращает словарь
+    с временем, размером результата и признаком совпадения данных.
+    """
+    ok = None
+    output_size = None
+
+    if stage == 'mtf':
+        with open(source, 'rb') as f:
+            data = f.read()
+        start = time.perf_counter()
+        encoded = MTFEncoder().encode(data)
+        seconds = time.perf_counter() - start
+        with open(work + '.mtf', 'wb') as f:
+            f.write(encoded)
+
+    elif stage == 'vitter_encode':
+        with open(work + '.mtf', 'rb') as f:
+            symbols = f.read()
+        output = io.BytesIO()
+        start = time.perf_counter()
+        encoder = VitterEncoder()
+        for symbol in symbols:
+            encoder.encode_symbol(symbol, output)
+        encoder.flush(output, eof_marker=False)
+        seconds = time.perf_counter() - start
+        output_size = output.tell()
+        with open(work + '.vit', 'wb') as f:
+            f.write(output.getvalue())
+
+    elif stage == 'vitter_decode':
+        with open(work + '.mtf', 'rb') as f:
+            symbols = f.read()
+        with open(work + '.vit', 'rb') as f:
+            stream = io.BytesIO(f.read())
+        start = time.perf_counter()
+        decoder = VitterDecoder()
+        decoded = bytearray(len(symbols))
+        for i in range(len(symbols)):
+            decoded[i] = decoder.decode_symbol(stream, eof_marker=False)
+        seconds = time.perf_counter() - start
+        ok = decoded == symbols
+
+    elif stage == 'compress':
+        compressor = make_compressor(options)
+        start = time.perf_counter()
+        _, output_size = compressor.compress(source, work + '.vts')
+        seconds = time.perf_counter() - start
+
+    elif stage == 'decompress':
+        compressor = make_compressor(options)
+        start = time.perf_counter()
+        compressor.decompress(work + '.vts', work + '.out')
+        seconds = time.perf_counter() - start
+        with open(source, 'rb') as a, open(work + '.out', 'rb') as b:
+            ok = a.read() == b.read()
+        os.remove(work + '.out')
+
+    else:
+        raise ValueError(f"Неизвестная стадия '{stage}', есть: {', '.join(STAGES)}")
+
+    return {'seconds': seconds, 'output_size': output_size, 'ok': ok,
+            'peak_rss_kb': peak_rss_kb()}
+
+def measure(stage, source, work, options):
+    """Выполнить стадию в свежем процессе"""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run_stage, stage, source, work, options).result()
+
+def git_commit():
+    """Текущий коммит репозитория или None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def prepare(stage, done, source, work, options):
+    """Выполнить без замера стадии, результаты которых нужны stage,
+    если они еще не выполнены для этого файла"""
+    needed = PREREQUISITES.get(stage)
+    if needed is None or needed in done:
+        return
+    prepare(needed, done, source, work, options)
+    measure(needed, source, work, options)
+    done.add(needed)
+
+def run_benchmarks(corpus, stages, options, repeat=1, log=sys.stdout):
+    """Прогнать стадии по корпусу, вернуть список записей.
+    Из repeat запусков стадии берется самый быстрый. Недостающие входные
+    данные стадии готовятся заранее и в замеры не попадают."""
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='vitter-bench-')
+    try:
+        for name, path in corpus:
+            size = os.path.getsize(path)
+            work = os.path.join(work_dir, name)
+            done = set()
+            for stage in stages:
+                prepare(stage, done, path, work, options)
+                record = min((measure(stage, path, work, options) for _ in range(repeat)),
+                             key=lambda record: record['seconds'])
+                seconds = record['seconds']
+                record.update({
+                    'file': name,
+                    'size': size,
+                    'stage': stage,
+                    'mb_s': size / (1 << 20) / seconds if seconds > 0 else None,
+                    'ssr': (1 - record['output_size'] / size) * 100
+                           if record['output_size'] is not None and size else None,
+                })
+                results.append(record)
+                done.add(stage)
+                print(format_record(record), file=log, flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def format_value(value, fmt):
+    return '-' if value is None else fmt % value
+
+def format_record(record):
+    """Строка таблицы для одной записи"""
+    ok = {None: '', True: 'ok', False: 'ОШИБКА'}[record['ok']]
+    return (f"{record['file']:<12} {record['stage']:<14} "
+            f"{format_value(record['mb_s'], '%8.3f'):>8} МБ/с "
+            f"{format_value(record['peak_rss_kb'], '%8d'):>8} КБ "
+            f"SSR {format_value(record['ssr'], '%6.2f%%'):>7} {ok}")
+
+def load_results(path):
+    """Записи из файла результатов: (файл, стадия) -> запись"""
+    with open(path) as f:
+        report = json.load(f)
+    return report, {(r['file'], r['stage']): r for r in report['results']}
+
+def compare(old_path, new_path, threshold=5.0, log=sys.stdout):
+    """Сравнить два файла результатов; вернуть число регрессий.
+
+    Регрессия - падение скорости или рост пикового RSS больше чем
+    на threshold процентов либо любое ухудшение SSR.
+    """
+    old_report, old = load_results(old_path)
+    new_report, new = load_results(new_path)
+    print(f"{old_path} ({old_report.get('commit')}) -> {new_path} ({new_report.get('commit')})",
+          file=log)
+
+    regressions = 0
+    for key in old:
+        if key not in new:
+            print(f"{key[0]:<12} {key[1]:<14} нет в новом файле", file=log)
+            continue
+        a, b = old[key], new[key]
+        notes = []
+
+        speed = change(a['mb_s'], b['mb_s'])
+        rss = change(a['peak_rss_kb'], b['peak_rss_kb'])
+        if speed is not None and speed < -threshold:
+            notes.append('медленнее')
+        if rss is not None and rss > threshold:
+            notes.append('больше памяти')
+        if a['ssr'] is not None and b['ssr'] is not None and b['ssr'] < a['ssr'] - 1e-9:
+            notes.append('хуже сжатие')
+        if b['ok'] is False:
+            notes.append('данные не совпали')
+        regressions += bool(notes)
+
+        ssr = (b['ssr'] - a['ssr']) if a['ssr'] is not None and b['ssr'] is not None else None
+        print(f"{key[0]:<12} {key[1]:<14} "
+              f"{format_value(a['mb_s'], '%.3f')} -> {format_value(b['mb_s'], '%.3f')} МБ/с "
+              f"({format_value(speed, '%+.1f%%')}), "
+              f"RSS {format_value(rss, '%+.1f%%')}, SSR {format_value(ssr, '%+.2f')} "
+              f"{', '.join(notes)}", file=log)
+
+    for key in new:
+        if key not in old:
+            print(f"{key[0]:<12} {key[1]:<14} новая запись", file=log)
+    return regressions
+
+def change(old, new):
+    """Изменение в процентах или None"""
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old * 100
+
+def main():
+    """Основная функция"""
+    args, options = parse_args(sys.argv[1:])
+
+    if args[:1] == ['compare'] and len(args) == 3:
+        regressions = compare(args[1], args[2], float(options.get('threshold') or 5))
+        print(f"Регрессий: {regressions}")
+        sys.exit(1 if regressions else 0)
+
+    if args[:1] != ['run'] or len(args) > 2:
+        print(__doc__)
+        return
+
+    stages = options['stages'].split(',') if options.get('stages') else STAGES
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"Неизвестные стадии: {', '.join(unknown)}; есть: {', '.join(STAGES)}")
+        sys.exit(1)
+    max_size = parse_size(options['max']) if options.get('max') else None
+    compressor_options = {name: value for name, value in options.items()
+                          if name in COMPRESSOR_OPTIONS}
+
+    output = args[1] if len(args) == 2 else None
+    # Без файла результатов JSON идет в stdout, таблица - в stderr
+    log = sys.stdout if output else sys.stderr
+
+    corpus_dir = options.get('corpus')
+    temporary = corpus_dir is None
+    if temporary:
+        corpus_dir = tempfile.mkdtemp(prefix='vitter-corpus-')
+    try:
+        corpus = build_corpus(corpus_dir, max_size)
+        results = run_benchmarks(corpus, stages, compressor_options,
+                                 int(options.get('repeat') or 1), log)
+    finally:
+        if temporary:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'options': compressor_options,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Результаты записаны в '{output}'")
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,259 @@
 import sys
 import os
-import difflib
+import abc
+import contextlib
+import io
+import re
+import struct
+import collections
+import heapq
+import zlib
+import copy
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class MTFEncoder:
     """Кодирование Move-To-Front"""
     def __init__(self):
-        self.alphabet = list(range(256))
+        # Алфавит в bytearray: поиск и сдвиги выполняются memmove на C
+        self.alphabet = bytearray(range(256))
     
     def encode(self, data):
         """Кодирование MTF"""
+        find = self.alphabet.find
+        remove = self.alphabet.pop
+        insert = self.alphabet.insert
         result = []
+        append = result.append
         for byte in data:
-            idx = self.alphabet.index(byte)
-            result.append(idx)
-            self.alphabet.pop(idx)
-            self.alphabet.insert(0, byte)
+            idx = find(byte)
+            if idx:
+                remove(idx)
+                insert(0, byte)
+            append(idx)
         return bytes(result)
     
     def decode(self, data):
         """Декодирование MTF"""
+        alphabet = self.alphabet
+        remove = alphabet.pop
+        insert = alphabet.insert
         result = []
+        append = result.append
         for idx in data:
-            byte = self.alphabet[idx]
-            result.append(byte)
-            self.alphabet.pop(idx)
-            self.alphabet.insert(0, byte)
+            if idx:
+                byte = remove(idx)
+                insert(0, byte)
+                append(byte)
+            else:
+                append(alphabet[0])
         return bytes(result)
 
+class BWTransform:
+    """Преобразование Барроуза-Уилера через суффиксный массив"""
+    def suffix_array(self, data):
+        """Суффиксный массив удвоением префиксов (с NumPy, если он есть)"""
+        if np is not None:
+            return self.suffix_array_numpy(data)
+        
+        n = len(data)
+        # Ранг 0 - конец строки: короткий суффикс меньше своего продолжения
+        rank = [byte + 1 for byte in data]
+        sa = sorted(range(n), key=rank.__getitem__)
+        # Ранги не больше max(n, 256), ключ пары рангов - одно число
+        base = max(n, 256) + 1
+        k = 1
+        while True:
+            key = [r * base + s for r, s in zip(rank, rank[k:] + [0] * k)]
+            sa.sort(key=key.__getitem__)
+            
+            current = 0
+            previous = -1
+            for i in sa:
+                if key[i] != previous:
+                    current += 1
+                    previous = key[i]
+                rank[i] = current
+            
+            if current == n or k >= n:
+                return sa
+            k *= 2
+    
+    def suffix_array_numpy(self, data):
+        """То же удвоение, сортировки и перенумерация - векторно"""
+        n = len(data)
+        rank = np.frombuffer(bytes(data), dtype=np.uint8).astype(np.int64) + 1
+        base = max(n, 256) + 1
+        k = 1
+        while True:
+            second = np.zeros(n, dtype=np.int64)
+            second[:n - k] = rank[k:]
+            key = rank * base + second
+            sa = np.argsort(key, kind='stable')
+            
+            sorted_key = key[sa]
+            new_rank = np.ones(n, dtype=np.int64)
+            new_rank[1:] = sorted_key[1:] != sorted_key[:-1]
+            new_rank = np.cumsum(new_rank)
+            rank[sa] = new_rank
+            
+            if new_rank[-1] == n or k >= n:
+                return sa.tolist()
+            k *= 2
+    
+    def encode(self, data):
+        """Прямое преобразование: (последний столбец, позиция конца строки)"""
+        n = len(data)
+        if n == 0:
+            return b'', 0
+        sa = self.suffix_array(data)
+        
+        # Полный последний столбец: строка матрицы с пустым суффиксом идет
+        # первой, символ конца строки стоит там, где суффикс начинается с 0
+        last = bytearray(n)
+        last[0] = data[n - 1]
+        pos = 1
+        primary = 0
+        for i in sa:
+            if i:
+                last[pos] = data[i - 1]
+                pos += 1
+            else:
+                primary = pos
+        return bytes(last), primary
+    
+    def decode(self, last, primary):
+        """Обратное преобразование через LF-отображение"""
+        n = len(last)
+        if n == 0:
+            return b''
+        
+        counts = [0] * 256
+        ranks = [0] * n
+        for i, byte in enumerate(last):
+            ranks[i] = counts[byte]
+            counts[byte] += 1
+        
+        # Первая строка матрицы начинается с символа конца строки
+        starts = [0] * 256
+        total = 1
+        for byte in range(256):
+            starts[byte] = total
+            total += counts[byte]
+        
+        result = bytearray(n)
+        row = 0
+        for k in range(n - 1, -1, -1):
+            j = row if row < primary else row - 1
+            byte = last[j]
+            result[k] = byte
+            row = starts[byte] + ranks[j]
+        return bytes(result)
+
+class ZeroRunEncoder:
+    """RLE серий нулей после MTF: два нуля и число дополнительных нулей"""
+    RUN = re.compile(rb'\x00{2,257}')
+    PACKED_RUN = re.compile(rb'\x00\x00(.)', re.DOTALL)
+    
+    def encode(self, data):
+        """Серия из 2..257 нулей -> 0, 0, длина - 2"""
+        return self.RUN.sub(lambda m: b'\x00\x00' + bytes([len(m.group()) - 2]), data)
+    
+    def decode(self, data):
+        """Обратное преобразование"""
+        return self.PACKED_RUN.sub(lambda m: bytes(m.group(1)[0] + 2), data)
+
 class VitterNode:
-    """Узел Виттера"""
-    def __init__(self, weight=0, symbol=None, parent=None):
-        self.weight = weight
-        self.symbol = symbol
-        self.parent = parent
-        self.left = None
-        self.right = None
-        self.order = 0
+    """Узел Виттера - отладочное представление узла из массивов дерева"""
+    __slots__ = ('tree', 'order')
+    
+    def __init__(self, tree, order):
+        self.tree = tree
+        self.order = order
+    
+    def __repr__(self):
+        return 'VitterNode(order=%d, weight=%d, symbol=%r)' % (
+            self.order, self.weight, self.symbol)
+    
+    def __eq__(self, other):
+        return (isinstance(other, VitterNode) and self.tree is other.tree
+                and self.order == other.order)
+    
+    def __hash__(self):
+        return hash(self.order)
+    
+    @property
+    def weight(self):
+        return self.tree.weight[self.order]
+    
+    @property
+    def symbol(self):
+        symbol = self.tree.symbol[self.order]
+        return None if symbol < 0 else symbol
+    
+    @property
+    def parent(self):
+        return self.tree.node(self.tree.parent[self.order])
+    
+    @property
+    def left(self):
+        return self.tree.node(self.tree.left[self.order])
+    
+    @property
+    def right(self):
+        return self.tree.node(self.tree.right[self.order])
     
     def is_leaf(self):
-        return self.left is None and self.right is None
+        return self.tree.left[self.order] < 0
     
     def is_nyt(self):
-        return self.symbol is None and self.weight == 0
+        return self.order == self.tree.nyt
 
 class Vitter:
-    """Виттер с NYT"""
+    """Виттер с NYT.
+    
+    Узлы хранятся в параллельных списках, индекс - порядковый номер узла
+    в неявной нумерации; -1 означает отсутствие связи или символа.
+    Перестановка узлов - обмен содержимым двух индексов, объекты узлов
+    не создаются (VitterNode - только отладочное представление).
+    Списки, а не array('i'): чтение из array упаковывает каждое число
+    заново, и на горячем пути это медленнее объектов узлов.
+    """
     def __init__(self):
-        self.nyt = VitterNode(weight=0, symbol=None) 
-        self.nyt.order = 1000
+        size = 1001
+        self.nyt = size - 1
         self.root = self.nyt
-        self.symbol_nodes = {}
-        self.nodes_list = [self.nyt]
+        self.weight = [0] * size
+        self.parent = [-1] * size
+        self.left = [-1] * size
+        self.right = [-1] * size
+        self.symbol = [-1] * size
+        # Символ -> порядковый номер его листа
+        self.symbol_nodes = [-1] * 256
         self.order_counter = 999
+        # Лидеры блоков: вес -> максимальный порядок среди узлов этого веса
+        self.leaders = {}
+        # Наименьшая глубина, на которой менялись связи дерева; по ней
+        # декодер решает, какие записи его таблицы префиксов устарели
+        self.dirty_depth = 1 << 30
+    
+    def node(self, order):
+        """Отладочное представление узла (None для -1)"""
+        if order < 0:
+            return None
+        return VitterNode(self, order)
     
     def find_node_by_symbol(self, symbol, node=None):
         """Найти узел по символу"""
         if node is None:
-            node = self.root
+            # Листья всех встреченных символов уже лежат в symbol_nodes
+            return self.node(self.symbol_nodes[symbol])
         
         if node.is_leaf() and node.symbol == symbol:
             return node
@@ -69,311 +266,1160 @@ class Vitter:
         
         return result
     
+    def path_bits(self, node):
+        """Код узла как (биты, длина) - проход от листа к корню"""
+        parents = self.parent
+        rights = self.right
+        bits = 0
+        length = 0
+        parent = parents[node]
+        while parent >= 0:
+            if rights[parent] == node:
+                bits |= 1 << length
+            length += 1
+            node = parent
+            parent = parents[node]
+        return bits, length
+    
+    def get_code_bits(self, symbol):
+        """Получить код символа как (биты, длина) или None"""
+        node = self.symbol_nodes[symbol]
+        if node < 0:
+            return None
+        return self.path_bits(node)
+    
+    def get_nyt_code_bits(self):
+        """Получить код NYT узла как (биты, длина)"""
+        return self.path_bits(self.nyt)
+    
     def get_code(self, symbol):
         """Получить код для символа"""
-        node = self.find_node_by_symbol(symbol)
-        if node is None:
+        code = self.get_code_bits(symbol)
+        if code is None:
             return None
-        
-        code = []
-        current = node
-        while current.parent:
-            parent = current.parent
-            if parent.left == current:
-                code.append(0)
-            else:
-                code.append(1)
-            current = parent
-        
-        return list(reversed(code))
+        bits, length = code
+        return [(bits >> i) & 1 for i in range(length - 1, -1, -1)]
     
     def get_nyt_code(self):
         """Получить код для NYT узла"""
-        code = []
-        node = self.nyt
-        while node.parent:
-            parent = node.parent
-            if parent.left == node:
-                code.append(0)
-            else:
-                code.append(1)
-            node = parent
-        
-        return list(reversed(code))
+        bits, length = self.get_nyt_code_bits()
+        return [(bits >> i) & 1 for i in range(length - 1, -1, -1)]
     
     def update_tree(self, symbol):
         """Обновить дерево после появления символа"""
-        if symbol in self.symbol_nodes:
-            node = self.symbol_nodes[symbol]
+        node = self.symbol_nodes[symbol]
+        if node >= 0:
             self.update_existing_symbol(node)
         else:
             self.add_new_symbol(symbol)
     
     def update_existing_symbol(self, node):
-        """Обновить существующий символ"""
-        # Найти блок с таким же весом и максимальным порядком
-        block_nodes = [n for n in self.nodes_list if n.weight == node.weight]
-        if block_nodes:
-            max_order_node = max(block_nodes, key=lambda n: n.order)
-            if max_order_node != node:
-                self.swap_nodes(node, max_order_node)
-        
-        node.weight += 1
-        
-        # Поднимаемся вверх по дереву
-        current = node.parent
-        while current:
-            block_nodes = [n for n in self.nodes_list if n.weight == current.weight]
-            if block_nodes:
-                max_order_node = max(block_nodes, key=lambda n: n.order)
-                if max_order_node != current:
-                    self.swap_nodes(current, max_order_node)
+        """Обновить существующий символ: подняться от узла к корню,
+        увеличивая веса и переставляя узлы на места лидеров блоков"""
+        weights = self.weight
+        parents = self.parent
+        leaders = self.leaders
+        while node >= 0:
+            weight = weights[node]
+            leader = leaders[weight]
+            # Лидером может оказаться родитель (брат узла - NYT), его не трогаем
+            if leader != node and leader != parents[node]:
+                self.swap_nodes(node, leader)
+                node = leader
             
-            current.weight += 1
-            current = current.parent
+            weights[node] = weight + 1
+            
+            # Узел покидает блок weight: лидером становится следующий по порядку
+            if leader == node:
+                lowest = self.order_counter
+                j = node - 1
+                while j > lowest and weights[j] > weight:
+                    j -= 1
+                if j > lowest and weights[j] == weight:
+                    leaders[weight] = j
+                else:
+                    del leaders[weight]
+            
+            # ...и входит в блок weight + 1
+            if leaders.get(weight + 1, -1) < node:
+                leaders[weight + 1] = node
+            node = parents[node]
     
     def add_new_symbol(self, symbol):
         """Добавить новый символ"""
-        # Создаем новый внутренний узел на месте NYT
-        new_internal = VitterNode(weight=1, symbol=None, parent=self.nyt.parent) 
-        new_internal.order = self.order_counter
-        self.order_counter -= 1
-        
-        # Создаем новый лист для символа
-        new_leaf = VitterNode(weight=1, symbol=symbol, parent=new_internal) 
-        new_leaf.order = self.order_counter
-        self.order_counter -= 1
-        
-        # Обновляем связи
-        if self.nyt.parent:
-            if self.nyt.parent.left == self.nyt:
-                self.nyt.parent.left = new_internal
+        # Новый внутренний узел встает на место NYT, лист - его правый сын
+        new_internal = self.order_counter
+        new_leaf = new_internal - 1
+        self.order_counter -= 2
+        
+        nyt = self.nyt
+        parent = self.parent[nyt]
+        if parent >= 0:
+            if self.left[parent] == nyt:
+                self.left[parent] = new_internal
             else:
-                self.nyt.parent.right = new_internal
+                self.right[parent] = new_internal
         else:
             self.root = new_internal
         
-        new_internal.left = self.nyt
-        new_internal.right = new_leaf
-        self.nyt.parent = new_internal
-        
-        # Добавляем в списки
+        self.weight[new_internal] = 1
+        self.parent[new_internal] = parent
+        self.left[new_internal] = nyt
+        self.right[new_internal] = new_leaf
+        self.weight[new_leaf] = 1
+        self.parent[new_leaf] = new_internal
+        self.symbol[new_leaf] = symbol
+        self.parent[nyt] = new_internal
         self.symbol_nodes[symbol] = new_leaf
-        self.nodes_list.append(new_internal)
-        self.nodes_list.append(new_leaf)
+        self.mark_dirty(parent)
+        # Новые узлы имеют наименьшие порядки, лидер блока 1 не сдвигается
+        if 1 not in self.leaders:
+            self.leaders[1] = new_internal
         
         # Обновляем дерево
-        current = new_internal.parent
-        while current:
-            block_nodes = [n for n in self.nodes_list if n.weight == current.weight]
-            if block_nodes:
-                max_order_node = max(block_nodes, key=lambda n: n.order)
-                if max_order_node != current:
-                    self.swap_nodes(current, max_order_node)
-            
-            current.weight += 1
-            current = current.parent
+        self.update_existing_symbol(parent)
+    
+    def mark_dirty(self, node):
+        """Отметить смену потомков у узла node (-1 - смена корня)"""
+        parents = self.parent
+        depth = -1
+        while node >= 0 and depth < self.dirty_depth:
+            node = parents[node]
+            depth += 1
+        if node < 0 and depth < self.dirty_depth:
+            self.dirty_depth = depth
     
     def swap_nodes(self, node1, node2):
-        """Поменять узлы местами"""
-        if node1 == node2 or not node1.parent or not node2.parent:
-            return
+        """Поменять узлы местами.
         
-        # Меняем местами в родителях
-        parent1 = node1.parent
-        parent2 = node2.parent
+        Места в дереве (родитель и сторона) остаются за индексами, между
+        индексами переезжает содержимое вместе с поддеревьями.
+        """
+        parents = self.parent
+        parent1 = parents[node1]
+        parent2 = parents[node2]
+        if node1 == node2 or parent1 < 0 or parent2 < 0:
+            return
         
-        if parent1.left == node1:
-            parent1.left = node2
-        else:
-            parent1.right = node2
+        self.mark_dirty(parent1)
+        self.mark_dirty(parent2)
         
-        if parent2.left == node2:
-            parent2.left = node1
-        else:
-            parent2.right = node1
+        weights, symbols, lefts, rights = self.weight, self.symbol, self.left, self.right
+        weights[node1], weights[node2] = weights[node2], weights[node1]
+        symbols[node1], symbols[node2] = symbols[node2], symbols[node1]
+        lefts[node1], lefts[node2] = lefts[node2], lefts[node1]
+        rights[node1], rights[node2] = rights[node2], rights[node1]
         
-        # Меняем родителей
-        node1.parent, node2.parent = parent2, parent1
+        for node in (node1, node2):
+            child = lefts[node]
+            if child >= 0:
+                parents[child] = node
+                parents[rights[node]] = node
+            else:
+                self.symbol_nodes[symbols[node]] = node
         
-        # Меняем порядок
-        node1.order, node2.order = node2.order, node1.order
+        # Братья, node1 слева: дерево не меняется, меняются только номера
+        if parent1 == parent2 and lefts[parent1] == node1:
+            lefts[parent1], rights[parent1] = node2, node1
+
+class BitWriter:
+    """Буферизованная побитовая запись в поток"""
+    def __init__(self, output_stream, chunk_size=1 << 16):
+        self.output_stream = output_stream
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.acc = 0
+        self.count = 0
+        self.written = 0
+    
+    def write_bits(self, bits, length):
+        """Записать length младших бит числа bits, старший бит первым"""
+        acc = (self.acc << length) | bits
+        count = self.count + length
+        if count >= 64:
+            # Целые байты уходят в буфер, в накопителе остается хвост < 8 бит
+            rest = count & 7
+            self.buffer += (acc >> rest).to_bytes(count >> 3, 'big')
+            acc &= (1 << rest) - 1
+            count = rest
+            if len(self.buffer) >= self.chunk_size:
+                self.output_stream.write(self.buffer)
+                self.written += len(self.buffer)
+                self.buffer = bytearray()
+        self.acc = acc
+        self.count = count
+    
+    def write_bit(self, bit):
+        """Записать один бит"""
+        self.write_bits(bit, 1)
+    
+    def align(self):
+        """Дополнить текущий байт нулями"""
+        if self.count & 7:
+            self.write_bits(0, 8 - (self.count & 7))
+    
+    def flush(self):
+        """Дополнить последний байт нулями и сбросить буфер в поток"""
+        count = self.count
+        if count & 7:
+            self.acc <<= 8 - (count & 7)
+            count += 8 - (count & 7)
+        self.buffer += self.acc.to_bytes(count >> 3, 'big')
+        self.output_stream.write(self.buffer)
+        self.written += len(self.buffer)
+        self.buffer = bytearray()
+        self.acc = 0
+        self.count = 0
+
+class BitReader:
+    """Буферизованное побитовое чтение из потока"""
+    def __init__(self, input_stream, chunk_size=1 << 16):
+        self.input_stream = input_stream
+        self.chunk_size = chunk_size
+        self.data = b''
+        self.pos = 0
+        self.acc = 0
+        self.count = 0
+    
+    def fill(self):
+        """Дочитать до 3 байт в накопитель; False, если поток закончился"""
+        if self.pos >= len(self.data):
+            self.data = self.input_stream.read(self.chunk_size)
+            self.pos = 0
+            if not self.data:
+                return False
+        chunk = self.data[self.pos:self.pos + 3]
+        self.pos += len(chunk)
+        self.acc = ((self.acc & ((1 << self.count) - 1)) << (len(chunk) << 3)) \
+            | int.from_bytes(chunk, 'big')
+        self.count += len(chunk) << 3
+        return True
+    
+    def align(self):
+        """Пропустить остаток текущего байта"""
+        self.count -= self.count & 7
+    
+    def read_bit(self):
+        """Прочитать бит; -1 в конце потока"""
+        if self.count == 0 and not self.fill():
+            return -1
+        self.count -= 1
+        return (self.acc >> self.count) & 1
+    
+    def peek_bits(self, length):
+        """Посмотреть следующие length бит, не забирая их; -1, если их нет"""
+        while self.count < length:
+            if not self.fill():
+                return -1
+        return (self.acc >> (self.count - length)) & ((1 << length) - 1)
+    
+    def read_bits(self, length):
+        """Прочитать length бит как число; -1, если поток закончился раньше"""
+        while self.count < length:
+            if not self.fill():
+                return -1
+        self.count -= length
+        return (self.acc >> self.count) & ((1 << length) - 1)
 
 class VitterEncoder: 
     """Кодировщик Виттера"""
     def __init__(self):
         self.tree = Vitter()
-        self.bit_buffer = 0
-        self.bit_count = 0
+        self.writer = None
+    
+    def get_writer(self, output_stream):
+        """Буферизованный писатель для потока"""
+        if self.writer is None or self.writer.output_stream is not output_stream:
+            if self.writer is not None:
+                self.writer.flush()
+            self.writer = BitWriter(output_stream)
+        return self.writer
     
     def encode_symbol(self, symbol, output_stream):
         """Закодировать один символ"""
-        code = self.tree.get_code(symbol)
+        writer = self.get_writer(output_stream)
+        code = self.tree.get_code_bits(symbol)
         
         if code is None:
-            # Новый символ
-            nyt_code = self.tree.get_nyt_code()
-            for bit in nyt_code:
-                self.output_bit(bit, output_stream)
-            
-            # ASCII код символа (8 бит)
-            for i in range(7, -1, -1):
-                bit = (symbol >> i) & 1
-                self.output_bit(bit, output_stream)
+            # Новый символ: код NYT и ASCII код символа (8 бит)
+            bits, length = self.tree.get_nyt_code_bits()
+            writer.write_bits(bits, length)
+            writer.write_bits(symbol, 8)
         else:
             # Существующий символ
-            for bit in code:
-                self.output_bit(bit, output_stream)
+            bits, length = code
+            writer.write_bits(bits, length)
         
         self.tree.update_tree(symbol)
     
+    def output_bits(self, bits, length, output_stream):
+        """Вывести length младших бит числа bits, старший бит первым"""
+        self.get_writer(output_stream).write_bits(bits, length)
+    
     def output_bit(self, bit, output_stream):
         """Вывести бит в поток"""
-        self.bit_buffer = (self.bit_buffer << 1) | bit
-        self.bit_count += 1
-        
-        if self.bit_count == 8:
-            output_stream.write(bytes([self.bit_buffer]))
-            self.bit_buffer = 0
-            self.bit_count = 0
+        self.get_writer(output_stream).write_bits(bit, 1)
     
-    def flush(self, output_stream):
+    def flush(self, output_stream, eof_marker=True):
         """Завершить кодирование"""
-        # Маркер конца файла
-        nyt_code = self.tree.get_nyt_code()
-        for bit in nyt_code:
-            self.output_bit(bit, output_stream)
-        
-        # Специальный символ 255
-        for i in range(7, -1, -1):
-            bit = (255 >> i) & 1
-            self.output_bit(bit, output_stream)
-        
-        if self.bit_count > 0:
-            self.bit_buffer <<= (8 - self.bit_count)
-            output_stream.write(bytes([self.bit_buffer]))
+        if eof_marker:
+            # Маркер конца файла: код NYT и специальный символ 255
+            bits, length = self.tree.get_nyt_code_bits()
+            self.output_bits(bits, length, output_stream)
+            self.output_bits(255, 8, output_stream)
+        self.get_writer(output_stream).flush()
 
 class VitterDecoder:
     """Декодировщик Виттера"""
-    def __init__(self):
+    def __init__(self, table_bits=6):
         self.tree = Vitter() 
-        self.bit_buffer = 0
-        self.bit_count = 0
+        self.reader = None
+        # Таблица префиксов: следующие table_bits бит -> (узел, число бит).
+        # Заполняется лениво; после перестроек дерева из нее выбрасываются
+        # записи, путь которых проходит через измененные узлы.
+        # table_bits=0 - побитовый спуск по дереву
+        self.table_bits = table_bits
+        self.table = {}
+    
+    def get_reader(self, input_stream):
+        """Буферизованный читатель для потока"""
+        if self.reader is None or self.reader.input_stream is not input_stream:
+            self.reader = BitReader(input_stream)
+        return self.reader
     
     def input_bit(self, input_stream):
         """Прочитать бит из потока"""
-        if self.bit_count == 0:
-            data = input_stream.read(1)
-            if not data:
-                return -1
-            self.bit_buffer = data[0]
-            self.bit_count = 8
-        
-        self.bit_count -= 1
-        bit = (self.bit_buffer >> self.bit_count) & 1
-        return bit
+        return self.get_reader(input_stream).read_bit()
+    
+    def walk_prefix(self, prefix):
+        """Спуститься от корня по битам префикса длины table_bits"""
+        tree = self.tree
+        node = tree.root
+        used = 0
+        shift = self.table_bits - 1
+        while tree.left[node] >= 0 and used < self.table_bits:
+            if (prefix >> (shift - used)) & 1:
+                node = tree.right[node]
+            else:
+                node = tree.left[node]
+            used += 1
+        return node, used
     
-    def decode_symbol(self, input_stream):
-        """Декодировать один символ"""
-        node = self.tree.root
+    def decode_symbol(self, input_stream, eof_marker=True):
+        """Декодировать один символ; 256 - маркер конца (NYT + 255).
         
-        while not node.is_leaf():
-            bit = self.input_bit(input_stream)
-            if bit == -1:
-                return 256
+        При eof_marker=False новый символ 255 - обычный символ, а не маркер
+        конца: так читаются потоки, длина которых известна заранее.
+        Конец данных посреди кода - всегда ValueError: вызывающему не нужно
+        проверять каждый символ, а в старом формате конец без маркера -
+        это поврежденный архив, а не законченный.
+        """
+        reader = self.get_reader(input_stream)
+        tree = self.tree
+        node = tree.root
+        
+        table_bits = self.table_bits
+        if table_bits:
+            if tree.dirty_depth < table_bits:
+                # Путь записи проходит узлы на глубинах 0..used-1
+                limit = tree.dirty_depth
+                self.table = {prefix: entry for prefix, entry in self.table.items()
+                              if entry[1] <= limit}
+                tree.dirty_depth = table_bits
             
-            if bit == 0:
-                node = node.left
-            else:
-                node = node.right
-        
-        if node.is_nyt():
-            ascii_code = 0
-            for i in range(8):
-                bit = self.input_bit(input_stream)
-                if bit == -1:
-                    return 256
-                ascii_code = (ascii_code << 1) | bit
+            # Несколько бит за шаг; у конца потока - побитовый спуск
+            prefix = reader.peek_bits(table_bits)
+            if prefix >= 0:
+                entry = self.table.get(prefix)
+                if entry is None:
+                    entry = self.walk_prefix(prefix)
+                    self.table[prefix] = entry
+                node, used = entry
+                reader.count -= used
+        
+        # Спуск по дереву на локальных копиях накопителя читателя
+        lefts = tree.left
+        rights = tree.right
+        acc = reader.acc
+        count = reader.count
+        while lefts[node] >= 0:
+            if count == 0:
+                reader.count = 0
+                if not reader.fill():
+                    raise ValueError("Архив поврежден: неожиданный конец файла")
+                acc = reader.acc
+                count = reader.count
             
-            if ascii_code == 255:
+            count -= 1
+            if (acc >> count) & 1:
+                node = rights[node]
+            else:
+                node = lefts[node]
+        reader.count = count
+        
+        if node == tree.nyt:
+            symbol = reader.read_bits(8)
+            if symbol == -1:
+                raise ValueError("Архив поврежден: неожиданный конец файла")
+            if symbol == 255 and eof_marker:
                 return 256
-            
-            symbol = ascii_code
         else:
-            symbol = node.symbol
-        
-        if symbol != 256:
-            self.tree.update_tree(symbol)
+            symbol = tree.symbol[node]
         
+        tree.update_tree(symbol)
         return symbol
 
+class EntropyCoder(abc.ABC):
+    """Энтропийный кодер блока: symbols -> поток бит и обратно"""
+    name = None
+    method = None
+    
+    @abc.abstractmethod
+    def encode(self, symbols, output_stream):
+        """Закодировать байты symbols в поток"""
+    
+    @abc.abstractmethod
+    def decode(self, input_stream, count):
+        """Раскодировать count символов из потока"""
+
+class VitterCoder(EntropyCoder):
+    """Адаптивный Хаффман (Виттер): один проход, дерево меняется на ходу"""
+    name = 'vitter'
+    method = 0
+    
+    def encode(self, symbols, output_stream):
+        encoder = VitterEncoder()
+        for byte in symbols:
+            encoder.encode_symbol(byte, output_stream)
+        # Длина блока хранится в заголовке, маркер конца не нужен
+        encoder.flush(output_stream, eof_marker=False)
+    
+    def decode(self, input_stream, count):
+        # Число символов известно; конец данных decode_symbol сообщит сам
+        decode_symbol = VitterDecoder().decode_symbol
+        symbols = bytearray(count)
+        for i in range(count):
+            symbols[i] = decode_symbol(input_stream, eof_marker=False)
+        return symbols
+
+class CanonicalHuffmanCoder(EntropyCoder):
+    """Статический канонический Хаффман: два прохода по блоку.
+    
+    Заголовок - 256 длин кодов по 4 бита, затем коды символов.
+    Декодирование - по таблице на MAX_BITS бит, один шаг на символ.
+    """
+    name = 'canonical'
+    method = 1
+    MAX_BITS = 15
+    
+    def code_lengths(self, freqs):
+        """Длины кодов Хаффмана не длиннее MAX_BITS"""
+        while True:
+            heap = [(freq, symbol, [symbol]) for symbol, freq in enumerate(freqs) if freq]
+            lengths = [0] * 256
+            if len(heap) == 1:
+                lengths[heap[0][1]] = 1
+                return lengths
+            heapq.heapify(heap)
+            while len(heap) > 1:
+                freq1, key1, group1 = heapq.heappop(heap)
+                freq2, key2, group2 = heapq.heappop(heap)
+                for symbol in group1:
+                    lengths[symbol] += 1
+                for symbol in group2:
+                    lengths[symbol] += 1
+                heapq.heappush(heap, (freq1 + freq2, min(key1, key2), group1 + group2))
+            if max(lengths) <= self.MAX_BITS:
+                return lengths
+            # Слишком длинные коды: сглаживаем частоты, как bzip2
+            freqs = [freq // 2 + 1 if freq else 0 for freq in freqs]
+    
+    def canonical_codes(self, lengths):
+        """Канонические коды по длинам: [(код, длина)] для каждого символа"""
+        codes = [(0, 0)] * 256
+        code = 0
+        previous = 0
+        for length, symbol in sorted((l, s) for s, l in enumerate(lengths) if l):
+            code <<= length - previous
+            codes[symbol] = (code, length)
+            code += 1
+            previous = length
+        return codes
+    
+    def encode(self, symbols, output_stream):
+        freqs = [0] * 256
+        for symbol, freq in collections.Counter(symbols).items():
+            freqs[symbol] = freq
+        lengths = self.code_lengths(freqs)
+        output_stream.write(bytes((lengths[i] << 4) | lengths[i + 1] for i in range(0, 256, 2)))
+        
+        codes = self.canonical_codes(lengths)
+        writer = BitWriter(output_stream)
+        write_bits = writer.write_bits
+        for symbol in symbols:
+            write_bits(*codes[symbol])
+        writer.flush()
+    
+    def decode(self, input_stream, count):
+        packed = read_exact(input_stream, 128)
+        lengths = []
+        for byte in packed:
+            lengths.append(byte >> 4)
+            lengths.append(byte & 15)
+        
+        # Таблица: следующие MAX_BITS бит -> символ << 4 | длина кода
+        max_bits = self.MAX_BITS
+        table = [0] * (1 << max_bits)
+        for symbol, (code, length) in enumerate(self.canonical_codes(lengths)):
+            if length:
+                start = code << (max_bits - length)
+                table[start:start + (1 << (max_bits - length))] = \
+                    [(symbol << 4) | length] * (1 << (max_bits - length))
+        
+        # Хвост дополнен нулями, чтобы последние коды читались той же таблицей
+        data = input_stream.read() + bytes(8)
+        symbols = bytearray(count)
+        mask = (1 << max_bits) - 1
+        acc = 0
+        bits = 0
+        pos = 0
+        for i in range(count):
+            if bits < max_bits:
+                acc = ((acc & ((1 << bits) - 1)) << 32) | int.from_bytes(data[pos:pos + 4], 'big')
+                pos += 4
+                bits += 32
+            entry = table[(acc >> (bits - max_bits)) & mask]
+            if not entry:
+                raise ValueError("Блок поврежден: неизвестный код")
+            symbols[i] = entry >> 4
+            bits -= entry & 15
+        if pos * 8 - bits > (len(data) - 8) * 8:
+            raise ValueError("Блок поврежден: данные закончились раньше времени")
+        return symbols
+
+# Энтропийные кодеры по номеру метода (младшие 4 бита байта метода) и имени
+ENTROPY_CODERS = {coder.method: coder for coder in (VitterCoder, CanonicalHuffmanCoder)}
+ENTROPY_CODER_NAMES = {coder.name: coder for coder in ENTROPY_CODERS.values()}
+
+# Потоковый формат: одно состояние MTF и дерева Виттера на весь файл.
+#   заголовок: STREAM_MAGIC, версия, флаги
+#   кадр:      длина (32 бита), коды символов кадра, выравнивание до байта
+#   конец:     кадр длины 0, общая длина (64 бита), CRC32 при STREAM_FLAG_CRC
+# Файлы без сигнатуры - старый формат, где конец отмечен NYT + 255.
+STREAM_MAGIC = b'VTRS'
+STREAM_VERSION = 1
+STREAM_HEADER = struct.Struct('>4sBB')
+STREAM_FLAG_CRC = 0x01
+# Кадры не длиннее: длину из архива нельзя использовать для выделения памяти без предела
+MAX_FRAME_SIZE = 1 << 24
+
+# Блочный формат: независимые блоки со своими MTF и деревом Виттера.
+#   заголовок: BLOCK_MAGIC, версия, метод (кодер и стадии), размер блока
+#   блок:      исходный размер, сжатый размер, CRC32 исходных данных
+#              (нет в версии 1), данные блока
+#              (со стадиями BWT/RLE данные начинаются со STAGE_HEADER)
+#   (0, 0):    конец блоков
+#   индекс:    (смещение, исходный размер, сжатый размер) для каждого блока
+#   хвост:     смещение индекса, число блоков, INDEX_MAGIC
+BLOCK_MAGIC = b'VTRB'
+BLOCK_VERSION = 2
+BLOCK_HEADER = struct.Struct('>4sBBI')
+BLOCK_ENTRY = struct.Struct('>III')
+# Заголовки блоков по версиям формата
+BLOCK_ENTRIES = {1: struct.Struct('>II'), 2: BLOCK_ENTRY}
+INDEX_ENTRY = struct.Struct('>QII')
+INDEX_MAGIC = b'VTRI'
+INDEX_TRAILER = struct.Struct('>QI4s')
+METHOD_MTF_VITTER = 0
+# Младшие 4 бита байта метода - энтропийный кодер, старшие - флаги стадий
+METHOD_CODER = 0x0F
+METHOD_BWT = 0x10
+METHOD_RLE = 0x20
+METHOD_STAGES = METHOD_BWT | METHOD_RLE
+# Перед данными блока со стадиями: позиция конца строки BWT, число символов
+STAGE_HEADER = struct.Struct('>II')
+# Размер блока, если блоки нужны стадиям или кодеру, а размер не задан
+DEFAULT_BLOCK_SIZE = 900 * 1024
+# Суффиксный массив держит несколько чисел на байт блока
+BWT_MAX_BLOCK_SIZE = 4 << 20
+
+# Многофайловый архив: каждый файл - отдельный потоковый или блочный архив.
+#   заголовок: ARCHIVE_MAGIC, версия
+#   файлы:     сжатые файлы подряд
+#   каталог:   для каждого файла ARCHIVE_ENTRY (исходный размер, смещение,
+#              сжатый размер, длина имени) и имя в UTF-8
+#   хвост:     INDEX_TRAILER со смещением каталога, числом файлов и DIRECTORY_MAGIC
+ARCHIVE_MAGIC = b'VTRA'
+ARCHIVE_VERSION = 1
+ARCHIVE_HEADER = struct.Struct('>4sB')
+ARCHIVE_ENTRY = struct.Struct('>QQQH')
+DIRECTORY_MAGIC = b'VTRD'
+
+def compress_block(data, method=METHOD_MTF_VITTER):
+    """Сжать независимый блок: MTF и состояние кодера начинаются с нуля"""
+    primary = 0
+    if method & METHOD_BWT:
+        data, primary = BWTransform().encode(data)
+    symbols = MTFEncoder().encode(data)
+    if method & METHOD_RLE:
+        symbols = ZeroRunEncoder().encode(symbols)
+    
+    output = io.BytesIO()
+    if method & METHOD_STAGES:
+        output.write(STAGE_HEADER.pack(primary, len(symbols)))
+    ENTROPY_CODERS[method & METHOD_CODER]().encode(symbols, output)
+    return output.getvalue()
+
+def decompress_block(payload, size, method=METHOD_MTF_VITTER):
+    """Распаковать блок известного исходного размера"""
+    source = io.BytesIO(payload)
+    primary = 0
+    count = size
+    if method & METHOD_STAGES:
+        primary, count = STAGE_HEADER.unpack(read_exact(source, STAGE_HEADER.size))
+    # Любой код символа - хотя бы один бит: больше символов в блоке быть не может,
+    # а буфер под count символов выделяется до декодирования
+    if count > 8 * len(payload):
+        raise ValueError(f"Блок поврежден: {count} символов в {len(payload)} байтах")
+    
+    symbols = ENTROPY_CODERS[method & METHOD_CODER]().decode(source, count)
+    if method & METHOD_RLE:
+        symbols = ZeroRunEncoder().decode(symbols)
+    data = MTFEncoder().decode(symbols)
+    if method & METHOD_BWT:
+        data = BWTransform().decode(data, primary)
+    if len(data) != size:
+        raise ValueError("Блок поврежден: неверный размер после распаковки")
+    return data
+
+def parallel_map(func, tasks, workers):
+    """map по процессам с сохранением порядка и ограниченной очередью задач"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for args in tasks:
+            yield func(*args)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for args in tasks:
+            pending.append(pool.submit(func, *args))
+            # В памяти не больше двух блоков на процесс
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class PrefixedStream:
+    """Поток, перед которым возвращаются уже прочитанные байты"""
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+    
+    def read(self, size=-1):
+        prefix = self.prefix
+        if not prefix:
+            return self.stream.read(size)
+        self.prefix = b''
+        if size < 0:
+            return prefix + self.stream.read()
+        if size <= len(prefix):
+            self.prefix = prefix[size:]
+            return prefix[:size]
+        return prefix + self.stream.read(size - len(prefix))
+
+def read_exact(stream, size):
+    """Прочитать ровно size байт"""
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Архив поврежден: неожиданный конец файла")
+    return data
+
+def read_trailer(stream, expected):
+    """Прочитать хвост архива: (смещение индекса, число записей)"""
+    stream.seek(-INDEX_TRAILER.size, os.SEEK_END)
+    index_offset, count, magic = INDEX_TRAILER.unpack(read_exact(stream, INDEX_TRAILER.size))
+    if magic != expected:
+        return None
+    return index_offset, count
+
+def read_block_index(stream):
+    """Прочитать индекс блоков из конца архива"""
+    trailer = read_trailer(stream, INDEX_MAGIC)
+    if trailer is None:
+        raise ValueError("Архив не содержит индекса блоков")
+    index_offset, count = trailer
+    stream.seek(index_offset)
+    table = read_exact(stream, INDEX_ENTRY.size * count)
+    return [INDEX_ENTRY.unpack_from(table, i * INDEX_ENTRY.size) for i in range(count)]
+
+def read_block_entry(stream, version):
+    """Заголовок блока: (исходный размер, сжатый размер, CRC32 или None)"""
+    entry = BLOCK_ENTRIES[version]
+    fields = entry.unpack(read_exact(stream, entry.size))
+    if version == 1:
+        return fields + (None,)
+    return fields
+
+def check_block_crc(data, crc, number):
+    """Сверить CRC32 распакованного блока с записанной"""
+    if crc is not None and zlib.crc32(data) != crc:
+        raise ValueError(f"Архив поврежден: CRC32 блока {number} не совпадает")
+
+def has_checksum(header):
+    """Хранит ли архив, начинающийся с header, контрольные суммы данных"""
+    if header[:4] == STREAM_MAGIC:
+        return len(header) > 5 and bool(header[5] & STREAM_FLAG_CRC)
+    if header[:4] == BLOCK_MAGIC:
+        return len(header) > 4 and header[4] >= 2
+    return False
+
+class NullSink:
+    """Приемник, который отбрасывает данные: для проверки без записи"""
+    def write(self, data):
+        return len(data)
+    
+    def flush(self):
+        pass
+
+def verify_stream(compressor, src):
+    """Распаковать архив из src в пустой приемник.
+    Возвращает (размер данных, проверены ли контрольные суммы)."""
+    header = src.read(STREAM_HEADER.size)
+    size = compressor.decompress_from(PrefixedStream(header, src), NullSink())
+    return size, has_checksum(header)
+
+def verify_member(compressor, input_file, offset):
+    """Проверить файл многофайлового архива по смещению (в процессе пула)"""
+    with open(input_file, 'rb') as src:
+        src.seek(offset)
+        return verify_stream(compressor, src)
+
+def read_directory(stream):
+    """Каталог многофайлового архива: список (имя, размер, смещение, сжатый размер)"""
+    magic, version = ARCHIVE_HEADER.unpack(read_exact(stream, ARCHIVE_HEADER.size))
+    trailer = read_trailer(stream, DIRECTORY_MAGIC)
+    if magic != ARCHIVE_MAGIC or trailer is None:
+        raise ValueError("Файл не является многофайловым архивом")
+    if version != ARCHIVE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия многофайлового архива: {version}")
+    
+    directory_offset, count = trailer
+    stream.seek(directory_offset)
+    entries = []
+    for _ in range(count):
+        size, offset, packed_size, name_size = ARCHIVE_ENTRY.unpack(
+            read_exact(stream, ARCHIVE_ENTRY.size))
+        name = read_exact(stream, name_size).decode('utf-8')
+        check_member_name(name)
+        entries.append((name, size, offset, packed_size))
+    return entries
+
+def check_member_name(name):
+    """Имя из каталога архива: только относительный путь через '/' без '.' и '..'.
+    Каталог читается из файла, поэтому имя проверяется заново, а не только в archive_name"""
+    parts = name.split('/')
+    if any(part in ('', '.', '..') for part in parts) or '\\' in name or '\0' in name \
+            or re.match(r'[A-Za-z]:', name):
+        raise ValueError(f"Архив поврежден: недопустимое имя файла '{name}'")
+
+def archive_name(path):
+    """Имя файла в архиве: путь через '/' без корня и '..'"""
+    parts = [part for part in path.replace(os.sep, '/').split('/')
+             if part not in ('', '.', '..')]
+    if not parts:
+        raise ValueError(f"Недопустимое имя файла для архива: '{path}'")
+    name = '/'.join(parts)
+    check_member_name(name)
+    return name
+
+def compress_member(compressor, input_file, output_file):
+    """Сжать один файл многофайлового архива (выполняется в процессе пула)"""
+    compressor.compress(input_file, output_file)
+    return os.path.getsize(input_file), os.path.getsize(output_file)
+
+def extract_member(compressor, input_file, offset, output_file):
+    """Распаковать файл многофайлового архива по смещению (в процессе пула)"""
+    with open(input_file, 'rb') as src, open_stream(output_file, 'wb') as dst:
+        src.seek(offset)
+        return compressor.decompress_from(src, dst)
+
+def open_stream(path, mode):
+    """Открыть файл; '-' - стандартный ввод или вывод"""
+    if path == '-':
+        if 'r' in mode:
+            return contextlib.nullcontext(sys.stdin.buffer)
+        return contextlib.nullcontext(sys.stdout.buffer)
+    return open(path, mode)
+
 class VitterCompressor:
     """Архиватор с Виттером"""
-    def __init__(self):
-        pass
+    def __init__(self, chunk_size=1 << 16, block_size=None, workers=None,
+                 bwt=False, rle=False, coder='vitter', crc=True):
+        # Размер порции: и вход, и выход обрабатываются кусками этого размера
+        self.chunk_size = chunk_size
+        # Записывать CRC32 исходных данных в потоковый формат
+        self.crc = crc
+        # block_size задан - блочный формат, блоки сжимаются в workers процессах
+        self.block_size = block_size
+        self.workers = workers
+        
+        # BWT, RLE нулей и статический кодер работают только по блокам
+        if coder not in ENTROPY_CODER_NAMES:
+            raise ValueError(f"Неизвестный кодер '{coder}', есть: {', '.join(ENTROPY_CODER_NAMES)}")
+        self.method = ENTROPY_CODER_NAMES[coder].method
+        if bwt:
+            self.method |= METHOD_BWT
+        if rle:
+            self.method |= METHOD_RLE
+        if self.method != METHOD_MTF_VITTER and not self.block_size:
+            self.block_size = DEFAULT_BLOCK_SIZE
+        if bwt and self.block_size > BWT_MAX_BLOCK_SIZE:
+            raise ValueError(f"Размер блока для BWT не больше {BWT_MAX_BLOCK_SIZE} байт")
     
     def compress(self, input_file, output_file):
-        """Сжатие файла"""
-        with open(input_file, 'rb') as f:
-            data = f.read()
+        """Сжатие файла; возвращает (исходный размер, сжатый размер)"""
+        if self.block_size:
+            return self.compress_blocks(input_file, output_file)
         
-        if not data:
-            return
+        with open_stream(input_file, 'rb') as src, \
+             open_stream(output_file, 'wb') as dst:
+            flags = STREAM_FLAG_CRC if self.crc else 0
+            dst.write(STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, flags))
+            
+            # MTF + адаптивный Хаффман, состояние переходит между кадрами
+            mtf = MTFEncoder()
+            encoder = VitterEncoder()
+            writer = encoder.get_writer(dst)
+            original_size = 0
+            crc = 0
+            while True:
+                chunk = src.read(min(self.chunk_size, MAX_FRAME_SIZE))
+                writer.write_bits(len(chunk), 32)
+                if not chunk:
+                    break
+                for byte in mtf.encode(chunk):
+                    encoder.encode_symbol(byte, dst)
+                writer.align()
+                original_size += len(chunk)
+                if self.crc:
+                    crc = zlib.crc32(chunk, crc)
+            
+            writer.write_bits(original_size, 64)
+            if self.crc:
+                writer.write_bits(crc, 32)
+            writer.flush()
+            dst.flush()
         
-        # MTF преобразование
-        mtf = MTFEncoder()
-        mtf_data = mtf.encode(data)
+        return original_size, STREAM_HEADER.size + writer.written
+    
+    def decompress(self, input_file, output_file):
+        """Распаковка файла; возвращает размер распакованных данных"""
+        with open_stream(input_file, 'rb') as src, \
+             open_stream(output_file, 'wb') as dst:
+            return self.decompress_from(src, dst)
+    
+    def decompress_from(self, src, dst):
+        """Распаковка архива любого формата с текущей позиции src"""
+        magic = src.read(len(BLOCK_MAGIC))
+        if magic == BLOCK_MAGIC:
+            return self.decompress_blocks(src, dst)
+        if magic == STREAM_MAGIC:
+            return self.decompress_stream(src, dst)
+        if magic == ARCHIVE_MAGIC:
+            raise ValueError("Многофайловый архив: используйте команды list и extract")
+        return self.decompress_legacy(PrefixedStream(magic, src), dst)
+    
+    def decompress_stream(self, src, dst):
+        """Распаковка потокового формата (сигнатура уже прочитана из src)"""
+        header = STREAM_MAGIC + read_exact(src, STREAM_HEADER.size - len(STREAM_MAGIC))
+        _, version, flags = STREAM_HEADER.unpack(header)
+        if version != STREAM_VERSION:
+            raise ValueError(f"Неподдерживаемая версия потокового формата: {version}")
         
-        # Адаптивное кодирование Хаффмана
-        with open(output_file, 'wb') as f:
-            encoder = VitterEncoder()   
+        decoder = VitterDecoder()
+        reader = decoder.get_reader(src)
+        decode_symbol = decoder.decode_symbol
+        mtf = MTFEncoder()
+        restored_size = 0
+        crc = 0
+        while True:
+            # Кадр: длина и ровно столько символов, без проверки маркера конца
+            length = reader.read_bits(32)
+            if length == -1:
+                raise ValueError("Архив поврежден: неожиданный конец файла")
+            if length == 0:
+                break
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"Архив поврежден: длина кадра {length} больше {MAX_FRAME_SIZE}")
             
-            for byte in mtf_data:
-                encoder.encode_symbol(byte, f)
+            symbols = bytearray(length)
+            for i in range(length):
+                symbols[i] = decode_symbol(src, eof_marker=False)
+            reader.align()
             
-            encoder.flush(f)
+            data = mtf.decode(symbols)
+            dst.write(data)
+            restored_size += length
+            if flags & STREAM_FLAG_CRC:
+                crc = zlib.crc32(data, crc)
+        dst.flush()
+        
+        if reader.read_bits(64) != restored_size:
+            raise ValueError("Архив поврежден: длина не совпадает с записанной")
+        if flags & STREAM_FLAG_CRC and reader.read_bits(32) != crc:
+            raise ValueError("Архив поврежден: CRC32 не совпадает")
+        return restored_size
     
-    def decompress(self, input_file, output_file):
-        """Распаковка файла"""
-        with open(input_file, 'rb') as f:
-            decoder = VitterDecoder() 
+    def decompress_legacy(self, src, dst):
+        """Распаковка старого формата без заголовка (конец - NYT + 255)"""
+        decoder = VitterDecoder() 
+        mtf = MTFEncoder()
+        
+        restored_size = 0
+        decoded_data = bytearray()
+        while True:
+            # Длина в этом формате не записана: конец узнаем только по маркеру
+            symbol = decoder.decode_symbol(src)
+            if symbol == 256:
+                break
+            decoded_data.append(symbol)
+            
+            # Обратное MTF преобразование порциями
+            if len(decoded_data) >= self.chunk_size:
+                dst.write(mtf.decode(decoded_data))
+                restored_size += len(decoded_data)
+                decoded_data.clear()
+        
+        # После маркера - только дополнение последнего байта нулями:
+        # у формата нет сигнатуры, и без этой проверки маркер, случайно
+        # встретившийся в постороннем файле, выглядел бы концом архива
+        reader = decoder.reader
+        if reader.count >= 8 or reader.acc & ((1 << reader.count) - 1) \
+                or reader.pos < len(reader.data) or src.read(1):
+            raise ValueError("Архив поврежден или не является архивом: данные после маркера конца")
+        
+        dst.write(mtf.decode(decoded_data))
+        dst.flush()
+        restored_size += len(decoded_data)
+        return restored_size
+    
+    def compress_blocks(self, input_file, output_file):
+        """Сжатие в блочный формат с параллельной обработкой блоков"""
+        with open_stream(input_file, 'rb') as src, \
+             open_stream(output_file, 'wb') as dst:
+            # Исходные размеры блоков в том же порядке, что и результаты
+            sizes = collections.deque()
+            def read_blocks():
+                while True:
+                    data = src.read(self.block_size)
+                    if not data:
+                        return
+                    sizes.append((len(data), zlib.crc32(data)))
+                    yield data, self.method
+            
+            dst.write(BLOCK_HEADER.pack(BLOCK_MAGIC, BLOCK_VERSION,
+                                        self.method, self.block_size))
+            offset = BLOCK_HEADER.size
+            original_size = 0
+            index = []
             
-            decoded_data = []
+            for payload in parallel_map(compress_block, read_blocks(), self.workers):
+                size, crc = sizes.popleft()
+                dst.write(BLOCK_ENTRY.pack(size, len(payload), crc))
+                dst.write(payload)
+                index.append((offset, size, len(payload)))
+                offset += BLOCK_ENTRY.size + len(payload)
+                original_size += size
+            
+            # Пустой блок отмечает конец данных для последовательного чтения
+            dst.write(BLOCK_ENTRY.pack(0, 0, 0))
+            offset += BLOCK_ENTRY.size
+            for entry in index:
+                dst.write(INDEX_ENTRY.pack(*entry))
+            dst.write(INDEX_TRAILER.pack(offset, len(index), INDEX_MAGIC))
+            dst.flush()
+            offset += INDEX_ENTRY.size * len(index) + INDEX_TRAILER.size
+        
+        return original_size, offset
+    
+    def decompress_blocks(self, src, dst):
+        """Распаковка блочного формата (сигнатура уже прочитана из src)"""
+        header = BLOCK_MAGIC + read_exact(src, BLOCK_HEADER.size - len(BLOCK_MAGIC))
+        _, version, method, _ = BLOCK_HEADER.unpack(header)
+        if version not in BLOCK_ENTRIES or method & ~(METHOD_STAGES | METHOD_CODER) \
+                or method & METHOD_CODER not in ENTROPY_CODERS:
+            raise ValueError(f"Неподдерживаемый блочный формат: версия {version}, метод {method}")
+        
+        crcs = collections.deque()
+        def tasks():
+            # Блоки читаются подряд до пустого блока перед индексом,
+            # так что подходит и неперематываемый поток
             while True:
-                symbol = decoder.decode_symbol(f)
-                if symbol == 256:
-                    break
-                decoded_data.append(symbol)
+                size, payload_size, crc = read_block_entry(src, version)
+                if size == 0:
+                    return
+                crcs.append(crc)
+                yield read_exact(src, payload_size), size, method
         
-        # Обратное MTF преобразование
-        mtf = MTFEncoder()
-        result_data = mtf.decode(bytes(decoded_data))
-        
-        with open(output_file, 'wb') as f:
-            f.write(result_data)
-
-def compare_files(file1, file2):
-    """Сравнение двух файлов с помощью diff"""
-    with open(file1, 'r', encoding='utf-8', errors='ignore') as f1:
-        with open(file2, 'r', encoding='utf-8', errors='ignore') as f2:
-            diff = list(difflib.unified_diff(
-                f1.readlines(),
-                f2.readlines(),
-                fromfile=file1,
-                tofile=file2,
-                lineterm=''
-            ))
-    
-    if not diff:
-        print("✓ Файлы идентичны")
-        return True
-    else:
-        print("✗ Файлы различаются")
-        for line in diff[:10]:
-            print(line)
-        if len(diff) > 10:
-            print(f"... и еще {len(diff) - 10} различий")
-        return False
+        restored_size = 0
+        for number, data in enumerate(parallel_map(decompress_block, tasks(), self.workers)):
+            check_block_crc(data, crcs.popleft(), number)
+            dst.write(data)
+            restored_size += len(data)
+        dst.flush()
+        return restored_size
+    
+    def decompress_single_block(self, input_file, number):
+        """Распаковать один блок по номеру, не трогая остальные"""
+        with open(input_file, 'rb') as src:
+            magic, version, method, _ = BLOCK_HEADER.unpack(read_exact(src, BLOCK_HEADER.size))
+            if magic != BLOCK_MAGIC or version not in BLOCK_ENTRIES:
+                raise ValueError("Архив не в блочном формате")
+            index = read_block_index(src)
+            if not 0 <= number < len(index):
+                raise ValueError(f"Нет блока с номером {number}, всего блоков: {len(index)}")
+            offset, size, payload_size = index[number]
+            src.seek(offset)
+            _, _, crc = read_block_entry(src, version)
+            data = decompress_block(read_exact(src, payload_size), size, method)
+            check_block_crc(data, crc, number)
+            return data
+    
+    def verify(self, input_file):
+        """Проверить архив, ничего не записывая.
+        
+        Данные распаковываются в пустой приемник, длины и CRC32 сверяются
+        по ходу распаковки; при повреждении - ValueError. Возвращает
+        (размер данных, проверены ли контрольные суммы): у старого формата
+        и потоков без CRC проверяется только структура.
+        """
+        with open_stream(input_file, 'rb') as src:
+            magic = src.read(len(ARCHIVE_MAGIC))
+            if magic != ARCHIVE_MAGIC:
+                return verify_stream(self, PrefixedStream(magic, src))
+        if input_file == '-':
+            # Каталог лежит в конце архива, файлы читаются по смещениям
+            raise ValueError("Многофайловый архив нельзя проверить из стандартного ввода")
+        
+        # Многофайловый архив: файлы проверяются параллельно
+        entries = self.list_files(input_file)
+        member = copy.copy(self)
+        member.workers = 1
+        tasks = [(member, input_file, offset) for _, _, offset, _ in entries]
+        restored_size = 0
+        checked = True
+        for (name, size, _, _), (member_size, member_checked) in \
+                zip(entries, parallel_map(verify_member, tasks, self.workers)):
+            if member_size != size:
+                raise ValueError(f"Архив поврежден: размер файла '{name}' не совпадает с каталогом")
+            restored_size += member_size
+            checked = checked and member_checked
+        return restored_size, checked
+    
+    def compress_files(self, input_files, output_file):
+        """Сжать несколько файлов в многофайловый архив с каталогом.
+        
+        Файлы сжимаются параллельно во временные файлы и дописываются
+        в архив по порядку; возвращает (исходный размер, сжатый размер).
+        """
+        names = [archive_name(path) for path in input_files]
+        if len(set(names)) != len(names):
+            duplicates = sorted({name for name in names if names.count(name) > 1})
+            raise ValueError(f"Повторяющиеся имена файлов: {', '.join(duplicates)}")
+        
+        # Параллельны файлы, блоки внутри файла сжимаются последовательно
+        member = copy.copy(self)
+        member.workers = 1
+        temp_dir = tempfile.mkdtemp(prefix='vitter-')
+        temp_files = [os.path.join(temp_dir, str(i)) for i in range(len(input_files))]
+        tasks = ((member, path, temp) for path, temp in zip(input_files, temp_files))
+        
+        try:
+            with open_stream(output_file, 'wb') as dst:
+                dst.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION))
+                offset = ARCHIVE_HEADER.size
+                original_size = 0
+                directory = []
+                
+                results = parallel_map(compress_member, tasks, self.workers)
+                for name, temp, (size, packed_size) in zip(names, temp_files, results):
+                    with open(temp, 'rb') as src:
+                        shutil.copyfileobj(src, dst, self.chunk_size)
+                    os.remove(temp)
+                    directory.append((name, size, offset, packed_size))
+                    offset += packed_size
+                    original_size += size
+                
+                directory_offset = offset
+                for name, size, member_offset, packed_size in directory:
+                    encoded = name.encode('utf-8')
+                    dst.write(ARCHIVE_ENTRY.pack(size, member_offset, packed_size, len(encoded)))
+                    dst.write(encoded)
+                    offset += ARCHIVE_ENTRY.size + len(encoded)
+                dst.write(INDEX_TRAILER.pack(directory_offset, len(directory), DIRECTORY_MAGIC))
+                dst.flush()
+                offset += INDEX_TRAILER.size
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        return original_size, offset
+    
+    def list_files(self, input_file):
+        """Каталог многофайлового архива: список (имя, размер, смещение, сжатый размер)"""
+        with open(input_file, 'rb') as src:
+            return read_directory(src)
+    
+    def extract_file(self, input_file, name, output_file):
+        """Распаковать один файл архива по имени, не трогая остальные"""
+        for entry_name, _, offset, _ in self.list_files(input_file):
+            if entry_name == name:
+                return extract_member(self, input_file, offset, output_file)
+        raise ValueError(f"В архиве нет файла '{name}'")
+    
+    def extract_files(self, input_file, directory, names=None):
+        """Распаковать файлы архива (все или names) в каталог, параллельно"""
+        entries = self.list_files(input_file)
+        if names:
+            missing = set(names) - {entry[0] for entry in entries}
+            if missing:
+                raise ValueError(f"В архиве нет файлов: {', '.join(sorted(missing))}")
+            entries = [entry for entry in entries if entry[0] in names]
+        
+        member = copy.copy(self)
+        member.workers = 1
+        tasks = []
+        root = os.path.realpath(directory)
+        for name, _, offset, _ in entries:
+            output_file = os.path.join(directory, *name.split('/'))
+            # Ссылка внутри каталога тоже не должна выводить файл наружу
+            if os.path.commonpath([root, os.path.realpath(output_file)]) != root:
+                raise ValueError(f"Файл '{name}' распаковывается за пределы каталога '{directory}'")
+            os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+            tasks.append((member, input_file, offset, output_file))
+        
+        restored_size = 0
+        for size in parallel_map(extract_member, tasks, self.workers):
+            restored_size += size
+        return [entry[0] for entry in entries], restored_size
+    
+def compare_files(file1, file2, chunk_size=1 << 16):
+    """Побайтовое сравнение двух файлов порциями; печатает первое различие"""
+    offset = 0
+    with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
+        while True:
+            chunk1 = f1.read(chunk_size)
+            chunk2 = f2.read(chunk_size)
+            if chunk1 != chunk2:
+                common = min(len(chunk1), len(chunk2))
+                diff = next((i for i in range(common) if chunk1[i] != chunk2[i]), common)
+                print("✗ Файлы различаются")
+                print(f"Первое различие на байте {offset + diff}")
+                return False
+            if not chunk1:
+                print("✓ Файлы идентичны")
+                return True
+            offset += len(chunk1)
 
 def calculate_compression_ratio(original_file, compressed_file):
     """Вычисление степени сжатия"""
@@ -386,51 +1432,168 @@ def calculate_compression_ratio(original_file, compressed_file):
     ssr = (1 - compressed_size / original_size) * 100
     return ssr
 
+def parse_args(argv):
+    """Разделить аргументы на позиционные и опции вида --имя=значение"""
+    args = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--'):
+            name, _, value = arg[2:].partition('=')
+            options[name] = value
+        else:
+            args.append(arg)
+    return args, options
+
+def parse_size(text):
+    """Размер с необязательным суффиксом K/M/G: '1M' -> 1048576"""
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+def make_compressor(options):
+    """Архиватор с опциями командной строки"""
+    return VitterCompressor(
+        block_size=parse_size(options['blocks']) if 'blocks' in options else None,
+        workers=int(options.get('workers') or 0) or None,
+        bwt='bwt' in options,
+        rle='bwt' in options or 'rle' in options,
+        coder=options.get('coder') or 'vitter',
+        crc='no-crc' not in options,
+    )
+
+def verify_main(input_file, options):
+    """Команда verify: проверка архива; при повреждении код возврата 1"""
+    if input_file != '-' and not os.path.exists(input_file):
+        print(f"Ошибка: файл '{input_file}' не найден")
+        sys.exit(1)
+    
+    try:
+        size, checked = make_compressor(options).verify(input_file)
+    except (ValueError, struct.error, OSError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    
+    if checked:
+        print(f"✓ Архив цел: {size} байт, контрольные суммы совпадают")
+    else:
+        print(f"✓ Архив читается: {size} байт (контрольных сумм нет, проверена только структура)")
+
+def archive_main(args, options):
+    """Команды многофайлового архива: archive, list, extract"""
+    command, archive_file, names = args[0], args[1], args[2:]
+    # При выводе в конвейер сообщения уходят в stderr
+    log = sys.stderr if options.get('output') == '-' else sys.stdout
+    
+    try:
+        compressor = make_compressor(options)
+        
+        if command == 'archive':
+            missing = [name for name in names if not os.path.isfile(name)]
+            if not names or missing:
+                print(f"Ошибка: файлы не найдены: {', '.join(missing) or 'не заданы'}", file=log)
+                return
+            print(f"Сжатие {len(names)} файлов в '{archive_file}'...", file=log)
+            original_size, compressed_size = compressor.compress_files(names, archive_file)
+            ssr = (1 - compressed_size / original_size) * 100 if original_size else 0
+            print(f"Исходный размер: {original_size} байт, архив: {compressed_size} байт, "
+                  f"SSR: {ssr:.2f}%", file=log)
+        
+        elif command == 'list':
+            entries = compressor.list_files(archive_file)
+            for name, size, _, packed_size in entries:
+                ssr = (1 - packed_size / size) * 100 if size else 0
+                print(f"{size:>12} {packed_size:>12} {ssr:>7.2f}%  {name}")
+            print(f"Файлов: {len(entries)}")
+        
+        elif 'output' in options:
+            if len(names) != 1:
+                print("Ошибка: с --output распаковывается ровно один файл", file=log)
+                return
+            size = compressor.extract_file(archive_file, names[0], options['output'])
+            print(f"Файл '{names[0]}' распакован ({size} байт)", file=log)
+        
+        else:
+            directory = options.get('dir') or '.'
+            extracted, size = compressor.extract_files(archive_file, directory, names)
+            for name in extracted:
+                print(name, file=log)
+            print(f"Распаковано файлов: {len(extracted)} ({size} байт) в '{directory}'", file=log)
+    
+    except Exception as e:
+        print(f"Ошибка: {e}", file=log)
+        import traceback
+        traceback.print_exc()
+
 def main():
     """Основная функция программы"""
-    if len(sys.argv) != 4:
+    args, options = parse_args(sys.argv[1:])
+    command = args[0] if args else None
+    if command in ('archive', 'list', 'extract') and len(args) >= 2:
+        return archive_main(args, options)
+    if command == 'verify' and len(args) == 2:
+        return verify_main(args[1], options)
+    if len(args) != 3:
         print("Использование:")
         print("  Сжатие: python archiver.py compress входной_файл выходной_файл")
         print("  Распаковка: python archiver.py decompress входной_файл выходной_файл")
+        print("  Вместо имени файла '-' - стандартный ввод/вывод")
+        print("  Проверка без распаковки на диск: python archiver.py verify архив")
+        print("Многофайловый архив:")
+        print("  python archiver.py archive архив файл...")
+        print("  python archiver.py list архив")
+        print("  python archiver.py extract архив [имя...] [--dir=каталог]")
+        print("  python archiver.py extract архив имя --output=файл   ('-' - стандартный вывод)")
+        print("Опции:")
+        print("  --blocks=1M    сжимать независимыми блоками заданного размера")
+        print("  --workers=N    число процессов для блоков (по умолчанию - все ядра)")
+        print("  --block=N      распаковать только блок с номером N")
+        print("  --bwt          BWT перед MTF и RLE серий нулей после него (блоки по 900K)")
+        print("  --rle          только RLE серий нулей после MTF")
+        print("  --coder=NAME   энтропийный кодер: vitter (по умолчанию) или canonical")
+        print("  --no-crc       не записывать CRC32 в потоковый архив")
         return
     
-    command = sys.argv[1]
-    input_file = sys.argv[2]
-    output_file = sys.argv[3]
+    command, input_file, output_file = args
     
-    if not os.path.exists(input_file):
-        print(f"Ошибка: файл '{input_file}' не найден")
-        return
+    # При выводе в конвейер сообщения уходят в stderr
+    log = sys.stderr if output_file == '-' else sys.stdout
     
-    compressor = VitterCompressor() 
+    if input_file != '-' and not os.path.exists(input_file):
+        print(f"Ошибка: файл '{input_file}' не найден", file=log)
+        return
     
     try:
+        compressor = make_compressor(options)
+        
         if command == 'compress':
-            print(f"Сжатие файла '{input_file}'...")
-            original_size = os.path.getsize(input_file)
-            compressor.compress(input_file, output_file)
-            compressed_size = os.path.getsize(output_file)
-            ssr = calculate_compression_ratio(input_file, output_file)
+            print(f"Сжатие файла '{input_file}'...", file=log)
+            original_size, compressed_size = compressor.compress(input_file, output_file)
+            ssr = (1 - compressed_size / original_size) * 100 if original_size else 0
             
-            print(f"Размер исходного файла: {original_size} байт")
-            print(f"Размер сжатого файла: {compressed_size} байт")
-            print(f"Степень сжатия (SSR): {ssr:.2f}%")
+            print(f"Размер исходного файла: {original_size} байт", file=log)
+            print(f"Размер сжатого файла: {compressed_size} байт", file=log)
+            print(f"Степень сжатия (SSR): {ssr:.2f}%", file=log)
             
+        elif command == 'decompress' and 'block' in options:
+            number = int(options['block'])
+            print(f"Распаковка блока {number} из '{input_file}'...", file=log)
+            data = compressor.decompress_single_block(input_file, number)
+            with open_stream(output_file, 'wb') as dst:
+                dst.write(data)
+            print(f"Блок распакован в '{output_file}' ({len(data)} байт)", file=log)
+        
         elif command == 'decompress':
-            print(f"Распаковка файла '{input_file}'...")
+            print(f"Распаковка файла '{input_file}'...", file=log)
             compressor.decompress(input_file, output_file)
-            print(f"Файл распакован в '{output_file}'")
-            
-            # Проверка целостности
-            if command == 'compress' and os.path.exists(input_file + ".orig"):
-                print(f"\nСравнение с оригиналом:")
-                compare_files(input_file + ".orig", output_file)
+            print(f"Файл распакован в '{output_file}'", file=log)
         
         else:
-            print(f"Неизвестная команда: {command}")
+            print(f"Неизвестная команда: {command}", file=log)
             
     except Exception as e:
-        print(f"Ошибка: {e}")
+        print(f"Ошибка: {e}", file=log)
         import traceback
         traceback.print_exc()
 
@@ -1,7 +1,8 @@
 # test_compression.py
 import os
 import sys
-from lab5 import VitterCompressor, MTFEncoder
+from lab5 import (VitterCompressor, MTFEncoder, BitWriter, BitReader, VitterEncoder,
+                  VitterDecoder, BWTransform, ZeroRunEncoder, CanonicalHuffmanCoder)
 
 def test_mtf():
     """Тестирование MTF кодирования/декодирования"""
@@ -31,6 +32,76 @@ def test_mtf():
     print(f"MTF коды: {list(encoded)}")
     print(f"Декодировано: {mtf2.decode(encoded)}")
     print()
+    
+    # Тест 3: Все байты алфавита, в том числе с дальних позиций
+    test_data = bytes(range(255, -1, -1)) * 2 + b"\x00\xff\x80"
+    encoded = MTFEncoder().encode(test_data)
+    decoded = MTFEncoder().decode(encoded)
+    print(f"MTF коды (начало): {list(encoded[:8])}, повтор: {list(encoded[256:264])}")
+    print(f"Совпадение: {test_data == decoded}")
+    print()
+
+def test_bit_io():
+    """Тестирование буферизованной побитовой записи и чтения"""
+    print("=" * 50)
+    print("Тестирование BitWriter / BitReader")
+    print("=" * 50)
+    
+    import io
+    import random
+    
+    random.seed(5)
+    codes = []
+    for _ in range(20000):
+        length = random.randint(1, 20)
+        codes.append((random.getrandbits(length), length))
+    
+    stream = io.BytesIO()
+    writer = BitWriter(stream, chunk_size=256)
+    for bits, length in codes:
+        writer.write_bits(bits, length)
+    writer.flush()
+    
+    total_bits = sum(length for _, length in codes)
+    print(f"Записано бит: {total_bits}, байт: {len(stream.getvalue())}")
+    
+    stream.seek(0)
+    reader = BitReader(stream, chunk_size=100)
+    ok = all(reader.read_bits(length) == bits for bits, length in codes)
+    padding = (-total_bits) % 8
+    ok = ok and reader.read_bits(padding) == 0 and reader.read_bit() == -1
+    print(f"Совпадение: {ok}")
+    print()
+
+def test_decoder_modes():
+    """Тестирование табличного и побитового декодирования"""
+    print("=" * 50)
+    print("Тестирование режимов декодера Виттера")
+    print("=" * 50)
+    
+    import io
+    import random
+    
+    random.seed(7)
+    symbols = [min(int(random.expovariate(0.3)), 254) for _ in range(20000)]
+    
+    stream = io.BytesIO()
+    encoder = VitterEncoder()
+    for symbol in symbols:
+        encoder.encode_symbol(symbol, stream)
+    encoder.flush(stream)
+    
+    for table_bits in (0, 4, 6, 10):
+        decoder = VitterDecoder(table_bits=table_bits)
+        source = io.BytesIO(stream.getvalue())
+        decoded = []
+        while True:
+            symbol = decoder.decode_symbol(source)
+            if symbol == 256:
+                break
+            decoded.append(symbol)
+        print(f"table_bits={table_bits}: совпадение {decoded == symbols}")
+    print()
 
 def test_adaptive_huffman():
     """Тестирование адаптивного Хаффмана"""
@@ -185,14 +256,345 @@ def test_file_compression():
             except:
                 pass
 
+def test_streaming():
+    """Тестирование потоковой обработки мелкими порциями"""
+    print("=" * 50)
+    print("Тестирование потокового сжатия")
+    print("=" * 50)
+    
+    import tempfile
+    
+    # Байты 255 в середине потока раньше принимались за конец файла
+    test_data = b"[  5.12] (II) Loading extension GLX\n" * 40 + bytes(range(256)) * 2 + b"tail"
+    paths = []
+    for suffix in ('.txt', '.bin', '.bin', '.txt'):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            paths.append(tmp.name)
+    input_file, comp_default, comp_small, decomp_file = paths
+    
+    try:
+        with open(input_file, 'wb') as f:
+            f.write(test_data)
+        
+        VitterCompressor().compress(input_file, comp_default)
+        small = VitterCompressor(chunk_size=7)
+        sizes = small.compress(input_file, comp_small)
+        restored = small.decompress(comp_small, decomp_file)
+        
+        # Архив порциями по 7 байт читается и обычным распаковщиком
+        VitterCompressor().decompress(comp_default, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            same_default = f.read() == test_data
+        VitterCompressor().decompress(comp_small, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            result = f.read()
+        
+        # Старый формат без заголовка: MTF + Виттер с маркером конца NYT + 255
+        with open(comp_default, 'wb') as f:
+            encoder = VitterEncoder()
+            for byte in MTFEncoder().encode(test_data[:300]):
+                encoder.encode_symbol(byte, f)
+            encoder.flush(f)
+        VitterCompressor().decompress(comp_default, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            legacy_ok = f.read() == test_data[:300]
+        
+        print(f"Размеры (исходный, сжатый): {sizes}, восстановлено: {restored}")
+        print(f"Архив с порцией по умолчанию: {same_default}")
+        print(f"Старый формат без заголовка: {legacy_ok}")
+        if result == test_data:
+            print("✓ Потоковая распаковка без потерь")
+        else:
+            print("✗ Ошибка потоковой распаковки")
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except:
+                pass
+
+def test_blocks():
+    """Тестирование блочного формата с параллельным сжатием"""
+    print("=" * 50)
+    print("Тестирование блочного формата")
+    print("=" * 50)
+    
+    import tempfile
+    import random
+    
+    random.seed(11)
+    test_data = (b"[  7.01] (WW) Falling back to old probe method\n" * 60
+                 + bytes(random.getrandbits(8) for _ in range(3000)))
+    paths = []
+    for suffix in ('.txt', '.vtb', '.txt'):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            paths.append(tmp.name)
+    input_file, comp_file, decomp_file = paths
+    
+    try:
+        with open(input_file, 'wb') as f:
+            f.write(test_data)
+        
+        compressor = VitterCompressor(block_size=1000, workers=2)
+        sizes = compressor.compress(input_file, comp_file)
+        compressor.decompress(comp_file, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            result = f.read()
+        
+        print(f"Размеры (исходный, сжатый): {sizes}")
+        if result == test_data:
+            print("✓ Блочный архив распакован без потерь")
+        else:
+            print("✗ Ошибка распаковки блочного архива")
+        
+        block = compressor.decompress_single_block(input_file=comp_file, number=3)
+        print(f"Блок 3 совпадает: {block == test_data[3000:4000]}")
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except:
+                pass
+
+def test_bwt():
+    """Тестирование BWT и RLE серий нулей"""
+    print("=" * 50)
+    print("Тестирование BWT + RLE")
+    print("=" * 50)
+    
+    import tempfile
+    
+    bwt = BWTransform()
+    last, primary = bwt.encode(b"banana")
+    print(f"BWT('banana'): {last}, позиция конца строки: {primary}")
+    print(f"Обратное BWT: {bwt.decode(last, primary)}")
+    
+    rle = ZeroRunEncoder()
+    runs = b"\x05" + b"\x00" * 2 + b"\x07" + b"\x00" * 300 + b"\x00\x01\x00"
+    packed = rle.encode(runs)
+    print(f"RLE: {len(runs)} -> {len(packed)} байт, совпадение: {rle.decode(packed) == runs}")
+    
+    test_data = b"[  5.13] (II) Loading extension DRI3\n" * 50 + bytes(range(256))
+    paths = []
+    for suffix in ('.txt', '.vtb', '.txt'):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            paths.append(tmp.name)
+    input_file, comp_file, decomp_file = paths
+    
+    try:
+        with open(input_file, 'wb') as f:
+            f.write(test_data)
+        
+        compressor = VitterCompressor(block_size=700, workers=1, bwt=True, rle=True)
+        sizes = compressor.compress(input_file, comp_file)
+        compressor.decompress(comp_file, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            result = f.read()
+        
+        print(f"Размеры (исходный, сжатый): {sizes}")
+        if result == test_data:
+            print("✓ BWT-архив распакован без потерь")
+        else:
+            print("✗ Ошибка распаковки BWT-архива")
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except:
+                pass
+
+def test_canonical():
+    """Тестирование статического канонического Хаффмана"""
+    print("=" * 50)
+    print("Тестирование канонического Хаффмана")
+    print("=" * 50)
+    
+    import io
+    import tempfile
+    
+    coder = CanonicalHuffmanCoder()
+    for test_data in (b"a", b"abracadabra", bytes(range(256)) * 4):
+        stream = io.BytesIO()
+        coder.encode(test_data, stream)
+        decoded = coder.decode(io.BytesIO(stream.getvalue()), len(test_data))
+        print(f"{len(test_data)} байт -> {len(stream.getvalue())} байт, "
+              f"совпадение: {bytes(decoded) == test_data}")
+    
+    # Частоты Фибоначчи дают коды длиннее MAX_BITS без ограничения
+    freqs = [1, 1]
+    while len(freqs) < 40:
+        freqs.append(freqs[-1] + freqs[-2])
+    lengths = coder.code_lengths(freqs + [0] * 216)
+    print(f"Максимальная длина кода: {max(lengths)} (предел {coder.MAX_BITS})")
+    
+    test_data = b"[  9.99] (EE) Screen(s) found, but none have a usable configuration\n" * 30
+    paths = []
+    for suffix in ('.txt', '.vtb', '.txt'):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            paths.append(tmp.name)
+    input_file, comp_file, decomp_file = paths
+    
+    try:
+        with open(input_file, 'wb') as f:
+            f.write(test_data)
+        
+        compressor = VitterCompressor(block_size=500, workers=1, coder='canonical')
+        sizes = compressor.compress(input_file, comp_file)
+        compressor.decompress(comp_file, decomp_file)
+        with open(decomp_file, 'rb') as f:
+            result = f.read()
+        
+        print(f"Размеры (исходный, сжатый): {sizes}")
+        if result == test_data:
+            print("✓ Архив с каноническим кодером распакован без потерь")
+        else:
+            print("✗ Ошибка распаковки архива с каноническим кодером")
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except:
+                pass
+
+def test_archive():
+    """Тестирование многофайлового архива"""
+    print("=" * 50)
+    print("Тестирование многофайлового архива")
+    print("=" * 50)
+    
+    import tempfile
+    import shutil
+    
+    work_dir = tempfile.mkdtemp()
+    files = {
+        'Xorg.0.log': b"[  7.01] (WW) Falling back to old probe method\n" * 40,
+        'old/Xorg.1.log': b"[  0.50] (II) Loading extension GLX\n" * 25 + b"\xff\x00",
+        'empty.log': b"",
+    }
+    try:
+        for name, data in files.items():
+            path = os.path.join(work_dir, 'src', name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        
+        archive = os.path.join(work_dir, 'logs.vta')
+        compressor = VitterCompressor(workers=2)
+        cwd = os.getcwd()
+        os.chdir(os.path.join(work_dir, 'src'))
+        try:
+            sizes = compressor.compress_files(list(files), archive)
+        finally:
+            os.chdir(cwd)
+        
+        entries = compressor.list_files(archive)
+        print(f"Размеры (исходный, сжатый): {sizes}")
+        print(f"Каталог: {[(name, size) for name, size, _, _ in entries]}")
+        
+        output = os.path.join(work_dir, 'one.log')
+        compressor.extract_file(archive, 'old/Xorg.1.log', output)
+        with open(output, 'rb') as f:
+            print(f"Отдельный файл совпадает: {f.read() == files['old/Xorg.1.log']}")
+        
+        out_dir = os.path.join(work_dir, 'out')
+        compressor.extract_files(archive, out_dir)
+        restored = {}
+        for name in files:
+            with open(os.path.join(out_dir, name), 'rb') as f:
+                restored[name] = f.read()
+        if restored == files:
+            print("✓ Многофайловый архив распакован без потерь")
+        else:
+            print("✗ Ошибка распаковки многофайлового архива")
+
+        # Имя с '..' в каталоге архива не должно выводить файл из каталога
+        with open(archive, 'rb') as f:
+            data = f.read()
+        bad_archive = os.path.join(work_dir, 'bad.vta')
+        with open(bad_archive, 'wb') as f:
+            f.write(data.replace(b'old/Xorg.1.log', b'../../Xorg.log'))
+        try:
+            compressor.extract_files(bad_archive, os.path.join(work_dir, 'bad', 'inner'))
+            print("✗ Имя с '..' распаковано")
+        except ValueError:
+            escaped = os.path.exists(os.path.join(work_dir, 'Xorg.log'))
+            print("✗ Файл записан вне каталога" if escaped else "✓ Имя с '..' отклонено")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_verify():
+    """Тестирование проверки архива без распаковки на диск"""
+    print("=" * 50)
+    print("Тестирование проверки архива")
+    print("=" * 50)
+    
+    import tempfile
+    
+    test_data = b"[  7.01] (EE) Failed to load module \"fbdev\"\n" * 80
+    paths = []
+    for suffix in ('.txt', '.vts', '.vtb'):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            paths.append(tmp.name)
+    input_file, stream_file, block_file = paths
+    
+    try:
+        with open(input_file, 'wb') as f:
+            f.write(test_data)
+        
+        compressor = VitterCompressor(workers=1)
+        compressor.compress(input_file, stream_file)
+        VitterCompressor(block_size=1000, workers=1).compress(input_file, block_file)
+        
+        results = []
+        for path in (stream_file, block_file):
+            print(f"Целый архив: {compressor.verify(path)}")
+            # Портим байт в середине сжатых данных
+            with open(path, 'r+b') as f:
+                f.seek(os.path.getsize(path) // 2)
+                byte = f.read(1)
+                f.seek(-1, os.SEEK_CUR)
+                f.write(bytes([byte[0] ^ 0x10]))
+            try:
+                compressor.verify(path)
+                results.append(False)
+            except ValueError as e:
+                print(f"Испорченный архив: {e}")
+                results.append(True)
+        
+        if all(results):
+            print("✓ Повреждения найдены без записи распакованных данных")
+        else:
+            print("✗ Повреждение не обнаружено")
+
+        # Обычный текстовый файл - не архив, даже без сигнатуры
+        try:
+            compressor.verify(input_file)
+            print("✗ Текстовый файл принят за архив")
+        except ValueError as e:
+            print(f"✓ Текстовый файл отклонен: {e}")
+    finally:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except:
+                pass
+
 def run_all_tests():
     """Запуск всех тестов"""
     print("Начало тестирования архиватора MTF + Адаптивный Хаффман")
     print()
     
     test_mtf()
+    test_bit_io()
+    test_decoder_modes()
     test_adaptive_huffman()
     test_file_compression()
+    test_streaming()
+    test_blocks()
+    test_bwt()
+    test_canonical()
+    test_archive()
+    test_verify()
     
     print("\n" + "=" * 50)
     print("Все тесты завершены")